@@ -0,0 +1,58 @@
+"""Positional and name lookups in a collection.
+
+Every pattern looks up each terminal of one module once:
+
+- position: `terminals[i]`, as used by the trace of connections by order.
+- name: `terminals[name]`.
+- rename: rename one terminal then look up a position, repeated.
+- delete: delete a terminal in the middle then look up a position, repeated.
+
+Usage: python benchmarks/bench_collection.py [count]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Module, Terminal  # noqa: E402
+
+
+def position(module: Module, count: int) -> None:
+    terminals = module.terminals
+    for i in range(count):
+        terminals[i]
+
+
+def name(module: Module, count: int) -> None:
+    terminals = module.terminals
+    for i in range(count):
+        terminals[f"T{i}"]
+
+
+def rename(module: Module, count: int) -> None:
+    terminals = module.terminals
+    for i in range(min(count, 1000)):
+        terminals[i].name = f"R{i}"
+        terminals[count // 2]
+
+
+def delete(module: Module, count: int) -> None:
+    terminals = module.terminals
+    for i in range(min(count, 1000)):
+        del terminals[f"T{i * 2}"]
+        terminals[len(terminals) // 2]
+
+
+def main(count: int = 20_000) -> None:
+    for case in (position, name, rename, delete):
+        module = Module("top", terminals=[Terminal(f"T{i}") for i in range(count)])
+        start = time.perf_counter()
+        case(module, count)
+        used = time.perf_counter() - start
+        print(f"{case.__name__:<10} {count:>8} terminals  {used:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
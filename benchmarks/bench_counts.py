@@ -0,0 +1,50 @@
+"""Flat device counts of a generated deep hierarchy.
+
+Every level instantiates the level below `fanout` times, the leaf cell has
+two MOS devices, so the top holds 2 * fanout ** levels flat devices.
+
+Usage: python benchmarks/bench_counts.py [levels] [fanout]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module  # noqa: E402
+
+
+def build(levels: int, fanout: int) -> Design:
+    modules = [
+        Module(
+            "cell0",
+            instances=[
+                Instance("nch", "M0", prefix="M"),
+                Instance("pch", "M1", prefix="M"),
+            ],
+        )
+    ]
+    for level in range(1, levels + 1):
+        modules.append(
+            Module(
+                f"cell{level}",
+                instances=[
+                    Instance(f"cell{level - 1}", f"X{i}") for i in range(fanout)
+                ],
+            )
+        )
+    return Design("deep", modules=modules)
+
+
+def main(levels: int = 8, fanout: int = 8) -> None:
+    design = build(levels, fanout)
+    for title in ("first", "again"):
+        start = time.perf_counter()
+        counts = design.getFlatCounts()[f"cell{levels}"]
+        used = time.perf_counter() - start
+        print(f"{title:<6} {counts['devices']['M']} devices  {used:8.6f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
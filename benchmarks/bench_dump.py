@@ -0,0 +1,48 @@
+"""SPICE dump throughput of a generated flat module, in instances per second.
+
+Every instance has `pins` pins and a few parameters, so most lines are
+wrapped at the default width. Width 0 dumps without wrapping.
+The structural Verilog of the same design is dumped last.
+
+Usage: python benchmarks/bench_dump.py [instances] [pins]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module, Terminal  # noqa: E402
+
+
+def build(instances: int, pins: int) -> Design:
+    cell = Module("cell", terminals=[Terminal(f"P{i}") for i in range(pins)])
+    top = Module(
+        "top",
+        instances=[
+            Instance(
+                "cell",
+                f"X{i}",
+                {f"P{j}": f"net_{i}_{j}" for j in range(pins)},
+            )
+            for i in range(instances)
+        ],
+    )
+    return Design("design", modules=[cell, top])
+
+
+def main(instances: int = 100000, pins: int = 8) -> None:
+    design = build(instances, pins)
+    for format, width in (("spice", 88), ("spice", 0), ("verilog", 88)):
+        start = time.perf_counter()
+        text = design.dump(format, width_limit=width)
+        used = time.perf_counter() - start
+        print(
+            f"{format:<7} width {width:<3} {instances / used:12.0f} inst/s"
+            f"  {len(text) / used / 1e6:8.2f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
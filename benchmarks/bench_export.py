@@ -0,0 +1,48 @@
+"""Parallel SPICE export of a generated library of independent modules.
+
+Every module has `instances` instances with 8 pins. The text is rendered
+with 1, 2, 4 and one worker per CPU and checked against the serial dump.
+
+Usage: python benchmarks/bench_export.py [modules] [instances]
+"""
+
+from pathlib import Path
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module  # noqa: E402
+
+
+def build(modules: int, instances: int) -> Design:
+    return Design(
+        "library",
+        modules=[
+            Module(
+                f"cell{i}",
+                instances=[
+                    Instance("cell", f"X{j}", [f"n{j}_{k}" for k in range(8)])
+                    for j in range(instances)
+                ],
+            )
+            for i in range(modules)
+        ],
+    )
+
+
+def main(modules: int = 200, instances: int = 1000) -> None:
+    design = build(modules, instances)
+    expected = None
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        text = design.dumpToSpice(workers=workers)
+        used = time.perf_counter() - start
+        expected = expected or text
+        assert text == expected
+        print(f"workers {workers:<3} {modules * instances / used:12.0f} inst/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
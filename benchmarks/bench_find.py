@@ -0,0 +1,38 @@
+"""`Collection.find` in a loop over the modules of a design.
+
+Every pattern is looked up once per module:
+
+- literal: the module name.
+- prefix: `name.*`.
+- regex: `name_\\d+`.
+
+Usage: python benchmarks/bench_find.py [count]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Module  # noqa: E402
+
+
+def main(count: int = 2000) -> None:
+    design = Design("find", modules=[Module(f"cell{i}") for i in range(count)])
+    modules = design.modules
+    cases = {
+        "literal": lambda name: modules.find(name),
+        "prefix": lambda name: modules.find(f"{name}.*"),
+        "regex": lambda name: modules.find(rf"{name}_\d+"),
+    }
+    for title, case in cases.items():
+        start = time.perf_counter()
+        for module in modules:
+            case(module.name)
+        used = time.perf_counter() - start
+        print(f"{title:<8} {count:>6} modules  {used:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
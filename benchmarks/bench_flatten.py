@@ -0,0 +1,59 @@
+"""Flat net extraction of a generated hierarchy.
+
+Every level instantiates the level below `fanout` times in a chain, each
+cell has two ports, VDD and one internal net per instance.
+
+Usage: python benchmarks/bench_flatten.py [levels] [fanout]
+"""
+
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module, Net, Terminal  # noqa: E402
+
+
+def build(levels: int, fanout: int) -> Design:
+    ports = [Terminal("A"), Terminal("Z"), Terminal("VDD")]
+    modules = [
+        Module(
+            "cell0",
+            terminals=ports,
+            nets=[Net("A"), Net("Z"), Net("VDD")],
+            instances=[Instance("nch", "M0", {"G": "A", "D": "Z", "S": "VDD"})],
+        )
+    ]
+    for level in range(1, levels + 1):
+        nets = ["A", *(f"n{i}" for i in range(1, fanout)), "Z"]
+        modules.append(
+            Module(
+                f"cell{level}",
+                terminals=[Terminal(t.name) for t in ports],
+                nets=[Net(n) for n in (*nets, "VDD")],
+                instances=[
+                    Instance(f"cell{level - 1}", f"X{i}", [nets[i], nets[i + 1], "VDD"])
+                    for i in range(fanout)
+                ],
+            )
+        )
+    return Design("flat", modules=modules)
+
+
+def main(levels: int = 5, fanout: int = 8) -> None:
+    design = build(levels, fanout)
+    start = time.perf_counter()
+    flat = design.flattenNets()
+    used = time.perf_counter() - start
+    del flat
+    tracemalloc.start()
+    flat = design.flattenNets()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{flat!r}  {used:8.3f} s  {memory / len(flat.names):6.1f} bytes/net")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,28 @@
+"""Master resolution of every instance in a flat design.
+
+Usage: python benchmarks/bench_master.py [count]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module  # noqa: E402
+
+
+def main(count: int = 200_000) -> None:
+    top = Module("top")
+    top.instances.extend(Instance(f"cell{i % 100}", f"X{i}") for i in range(count))
+    Design("master", modules=[top, *(Module(f"cell{i}") for i in range(100))])
+    for title in ("first", "again"):
+        start = time.perf_counter()
+        for inst in top.instances:
+            inst.reference.getMaster()
+        used = time.perf_counter() - start
+        print(f"{title:<6} {count} instances  {used:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""Memory used per instance of a flat module.
+
+Every instance comes with its own net, like a flat netlist where most nets
+connect a few devices. Two kinds of instances are measured: subckt calls
+without parameters and MOS devices with parameters.
+
+Usage: python benchmarks/bench_memory.py [count]
+"""
+
+from pathlib import Path
+import gc
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Instance, Module, Net  # noqa: E402
+
+
+def subckt(i: int) -> Instance:
+    return Instance("inv", f"X{i}", [f"n{i}", f"n{i + 1}", "VDD", "VSS"])
+
+
+def device(i: int) -> Instance:
+    return Instance(
+        "nch",
+        f"M{i}",
+        [f"n{i}", f"n{i + 1}", "VSS", "VSS"],
+        {"w": "1u", "l": "30n"},
+        prefix="M",
+    )
+
+
+def measure(factory, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    module = Module("top")
+    for i in range(count):
+        module.nets.append(Net(f"n{i}"))
+        module.instances.append(factory(i))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(module.instances) == count
+    return used / count
+
+
+def main(count: int = 100_000) -> None:
+    for title, factory in (("subckt", subckt), ("device", device)):
+        print(f"{title:<8} {measure(factory, count):8.1f} bytes/instance")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
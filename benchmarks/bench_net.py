@@ -0,0 +1,25 @@
+"""Construction throughput of named nets.
+
+Usage: python benchmarks/bench_net.py [count]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Net  # noqa: E402
+
+
+def main(count: int = 1_000_000) -> None:
+    names = [f"n{i}" for i in range(count)]
+    start = time.perf_counter()
+    for name in names:
+        Net(name)
+    used = time.perf_counter() - start
+    print(f"Net(name) {count / used / 1e6:6.2f} M/s  {used / count * 1e9:6.1f} ns/net")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
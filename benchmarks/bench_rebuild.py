@@ -0,0 +1,50 @@
+"""Verilog style rebuild of bus connections.
+
+The top module has `count` instances connected to its `width` bit buses by
+bus names: half of them are instances of a cell with bus terminals, the other
+half are connected by order to a black box without a master.
+
+Usage: python benchmarks/bench_rebuild.py [count] [width]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module, Net, Terminal  # noqa: E402
+
+
+def generate(count: int, width: int) -> Design:
+    bits = range(width - 1, -1, -1)
+    cell = Module(
+        "cell",
+        terminals=[Terminal(f"A[{i}]", "input") for i in bits]
+        + [Terminal(f"Z[{i}]", "output") for i in bits],
+    )
+    top = Module("top")
+    for n in range(count + 1):
+        top.nets.extend(Net(f"n{n}[{i}]") for i in bits)
+    for n in range(count):
+        if n % 2:
+            inst = Instance("cell", f"X{n}", {"A": f"n{n}", "Z": f"n{n + 1}"})
+        else:
+            inst = Instance("blackbox", f"X{n}", [f"n{n}", f"n{n + 1}"])
+        top.instances.append(inst)
+    return Design("rebuild", modules=[cell, top])
+
+
+def main(count: int = 2000, width: int = 32) -> None:
+    design = generate(count, width)
+    start = time.perf_counter()
+    design.modules["top"].instances.rebuild(mute=True, verilog_style=True)
+    used = time.perf_counter() - start
+    inst = design.modules["top"].instances["X1"]
+    assert inst.connection["A[0]"] == "n1[0]"
+    assert len(design.modules["top"].instances["X0"].connection) == width * 2
+    print(f"{count} instances x {width} bits  {used:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
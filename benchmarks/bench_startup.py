@@ -0,0 +1,77 @@
+"""Startup time with and without the cached PLY parse tables.
+
+Every sample runs in a fresh interpreter, so module import and parser
+construction are both included:
+
+- `ichier parse`: the loading step of `ichier parse` (`_main.load_file`)
+  on a tiny spice netlist, the interactive shell is not started.
+- `fromSpiceCode`: a single call on a tiny netlist.
+
+Usage: python benchmarks/bench_startup.py [repeat]
+"""
+
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+import os
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+
+NETLIST = dedent("""\
+    .SUBCKT inv A Z VDD VSS
+    *.PININFO A:I Z:O VDD:B VSS:B
+    M0 Z A VDD VDD pch w=1u l=1u
+    M1 Z A VSS VSS nch w=1u l=1u
+    .ENDS
+
+    .SUBCKT buf A Z VDD VSS
+    *.PININFO A:I Z:O VDD:B VSS:B
+    X0 A inter VDD VSS / inv
+    X1 inter Z VDD VSS / inv
+    .ENDS
+    """)
+
+CASES = {
+    "ichier parse": dedent("""\
+        import sys
+        from ichier._main import load_file
+        load_file(sys.argv[1], format="spice")
+        """),
+    "fromSpiceCode": dedent("""\
+        import sys
+        from pathlib import Path
+        from ichier import fromSpiceCode
+        fromSpiceCode(Path(sys.argv[1]).read_text())
+        """),
+}
+
+
+def run(code: str, netlist: Path, cache_dir: str) -> float:
+    env = dict(os.environ, ICHIER_CACHE_DIR=cache_dir, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code, str(netlist)], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def main(repeat: int = 5) -> None:
+    with TemporaryDirectory() as tmp:
+        netlist = Path(tmp) / "tiny.cdl"
+        netlist.write_text(NETLIST)
+        cache_dir = str(Path(tmp) / "cache")
+        for title, code in CASES.items():
+            nocache = median(run(code, netlist, "") for _ in range(repeat))
+            run(code, netlist, cache_dir)  # 预热缓存
+            cached = median(run(code, netlist, cache_dir) for _ in range(repeat))
+            print(
+                f"{title:<16} no cache {nocache * 1000:8.1f} ms"
+                f"  cached {cached * 1000:8.1f} ms"
+                f"  speedup {nocache / cached:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,72 @@
+"""Binary save/load of a generated library compared with pickle.
+
+Every module has `instances` instances with 8 pins and a parameter. Reports
+the file sizes, the save and load times, the time to open one module of a
+loaded design, and to load all of them.
+
+Usage: python benchmarks/bench_storage.py [modules] [instances]
+"""
+
+from pathlib import Path
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module  # noqa: E402
+
+
+def build(modules: int, instances: int) -> Design:
+    return Design(
+        "library",
+        modules=[
+            Module(
+                f"cell{i}",
+                instances=[
+                    Instance(
+                        "cell",
+                        f"X{j}",
+                        [f"n{j}_{k}" for k in range(8)],
+                        {"m": str(j % 4 + 1)},
+                    )
+                    for j in range(instances)
+                ],
+            )
+            for i in range(modules)
+        ],
+    )
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(modules: int = 200, instances: int = 1000) -> None:
+    design = build(modules, instances)
+    with tempfile.TemporaryDirectory() as tmp:
+        binary = Path(tmp) / "library.db"
+        pickled = Path(tmp) / "library.pkl"
+
+        _, save = timed(lambda: design.save(binary))
+        loaded, load = timed(lambda: Design.load(binary))
+        _, one = timed(lambda: len(loaded.modules[modules // 2].instances))
+        _, rest = timed(lambda: sum(len(m.instances) for m in loaded.modules))
+        print(
+            f"binary {binary.stat().st_size / 1e6:8.1f} MB  save {save:6.2f}s"
+            f"  load {load:6.3f}s  one module {one:6.3f}s  all {rest:6.2f}s"
+        )
+
+        _, save = timed(lambda: pickled.write_bytes(pickle.dumps(design)))
+        _, load = timed(lambda: pickle.loads(pickled.read_bytes()))
+        print(
+            f"pickle {pickled.stat().st_size / 1e6:8.1f} MB  save {save:6.2f}s"
+            f"  load {load:6.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
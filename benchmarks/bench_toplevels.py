@@ -0,0 +1,42 @@
+"""Top level queries on a generated flat library of cells.
+
+Every cell instantiates `fanout` other cells, the queries are repeated after
+each single instance change.
+
+Usage: python benchmarks/bench_toplevels.py [cells] [fanout] [repeat]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module  # noqa: E402
+
+
+def build(cells: int, fanout: int) -> Design:
+    modules = []
+    for i in range(cells):
+        insts = [Instance(f"cell{j}", f"X{j}") for j in range(i + 1, i + 1 + fanout)]
+        insts.append(Instance("nch", "M0", prefix="M"))
+        modules.append(Module(f"cell{i}", instances=insts))
+    return Design("library", modules=modules)
+
+
+def main(cells: int = 20000, fanout: int = 8, repeat: int = 100) -> None:
+    design = build(cells, fanout)
+    start = time.perf_counter()
+    tops = design.getTopLevelModules()
+    print(f"first  {len(tops)} tops  {time.perf_counter() - start:8.6f} s")
+    start = time.perf_counter()
+    for i in range(repeat):
+        design.modules[i].instances.append(Instance("pch", f"M{i + 1}"))
+        tops = design.getTopLevelModules()
+        design.modules.getMissingMasters()
+    used = (time.perf_counter() - start) / repeat
+    print(f"edit   {len(tops)} tops  {used:8.6f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
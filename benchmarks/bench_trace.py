@@ -0,0 +1,56 @@
+"""Trace of a supply net through a generated deep hierarchy.
+
+`stream` walks every hit with iterTrace, `unique` enters each master once.
+
+Every level instantiates the level below `fanout` times, all on the same
+VDD net, so the full route tree has fanout ** levels leaves.
+
+Usage: python benchmarks/bench_trace.py [levels] [fanout]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module, Net, Terminal  # noqa: E402
+
+
+def build(levels: int, fanout: int) -> Design:
+    modules = [Module("cell0", terminals=[Terminal("VDD")], nets=[Net("VDD")])]
+    for level in range(1, levels + 1):
+        modules.append(
+            Module(
+                f"cell{level}",
+                terminals=[Terminal("VDD")],
+                nets=[Net("VDD")],
+                instances=[
+                    Instance(f"cell{level - 1}", f"X{i}", {"VDD": "VDD"})
+                    for i in range(fanout)
+                ],
+            )
+        )
+    return Design("deep", modules=modules)
+
+
+def main(levels: int = 6, fanout: int = 8) -> None:
+    design = build(levels, fanout)
+    vdd = design.modules[f"cell{levels}"].nets["VDD"]
+    for title in ("first", "again"):
+        start = time.perf_counter()
+        vdd.trace()
+        used = time.perf_counter() - start
+        print(f"{title:<6} {levels} levels x {fanout}  {used:8.3f} s")
+    start = time.perf_counter()
+    hits = sum(1 for _ in vdd.iterTrace())
+    used = time.perf_counter() - start
+    print(f"stream {levels} levels x {fanout}  {used:8.3f} s  {hits} hits")
+    start = time.perf_counter()
+    hits = sum(1 for _ in vdd.iterTrace(unique=True))
+    used = time.perf_counter() - start
+    print(f"unique {levels} levels x {fanout}  {used:8.3f} s  {hits} hits")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""Verilog parse time against the number of instances in one module.
+
+The time per instance should stay about the same when the module grows,
+that is the parse time is linear in the number of module items.
+
+Usage: python benchmarks/bench_verilog_scaling.py [count ...]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier.parser.verilog import PreProc  # noqa: E402
+from ichier.parser.verilog.parser import VerilogParser  # noqa: E402
+
+
+def generate(count: int) -> str:
+    lines = [
+        "module inv (A, Z);",
+        "input A;",
+        "output Z;",
+        "endmodule",
+        "",
+        "module top (A, Z);",
+        "input A;",
+        "output Z;",
+        f"wire [{count}:0] n;",
+    ]
+    for i in range(count):
+        if i % 2:
+            lines.append(f"inv u{i} (.A(n[{i}]), .Z(n[{i + 1}]));")
+        else:
+            lines.append(f"inv u{i} (n[{i}], n[{i + 1}]);")
+    lines.append("endmodule")
+    return "\n".join(lines) + "\n"
+
+
+def main(*counts: int) -> None:
+    for count in counts or (10_000, 100_000, 1_000_000):
+        code = PreProc.process(generate(count))
+        start = time.perf_counter()
+        design = VerilogParser().parse(code)
+        used = time.perf_counter() - start
+        assert len(design.modules["top"].instances) == count
+        print(
+            f"{count:>9} instances  {used:8.2f} s"
+            f"  {used / count * 1e6:6.2f} us/instance"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
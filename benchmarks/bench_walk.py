@@ -0,0 +1,76 @@
+"""Time of walking every node of a hierarchical design.
+
+The design has `count` leaf cells and one top module instantiating each of
+them `fanout` times:
+
+- walk: every module, instance, net and terminal.
+- masters: the terminals of the master of every instance.
+- toplevels: `Design.getTopLevelModules`.
+
+Usage: python benchmarks/bench_walk.py [count] [fanout]
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ichier import Design, Instance, Module, Net, Terminal  # noqa: E402
+
+
+def generate(count: int, fanout: int) -> Design:
+    design = Design("walk")
+    for i in range(count):
+        design.modules.append(
+            Module(
+                f"cell{i}",
+                terminals=[Terminal("A", "input"), Terminal("Z", "output")],
+                nets=[Net("A"), Net("Z")],
+            )
+        )
+    top = Module("top", nets=[Net(f"n{i}") for i in range(count * fanout + 1)])
+    for i in range(count * fanout):
+        top.instances.append(
+            Instance(f"cell{i % count}", f"X{i}", {"A": f"n{i}", "Z": f"n{i + 1}"})
+        )
+    design.modules.append(top)
+    return design
+
+
+def walk(design: Design) -> int:
+    total = 0
+    for module in design.modules:
+        for inst in module.instances:
+            total += 1
+        for net in module.nets:
+            total += 1
+        for term in module.terminals:
+            total += 1
+    return total
+
+
+def masters(design: Design) -> int:
+    total = 0
+    for module in design.modules:
+        for inst in module.instances:
+            for term in design.modules[inst.reference.name].terminals:
+                total += 1
+    return total
+
+
+def toplevels(design: Design) -> int:
+    return len(design.getTopLevelModules())
+
+
+def main(count: int = 1000, fanout: int = 100) -> None:
+    design = generate(count, fanout)
+    for case in (walk, masters, toplevels):
+        start = time.perf_counter()
+        case(design)
+        used = time.perf_counter() - start
+        print(f"{case.__name__:<10} {used:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
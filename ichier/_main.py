@@ -10,6 +10,7 @@ from . import release
 from .parser import fromVerilog, fromSpice
 from .parser import verilog as vparser
 from .parser import spice as sparser
+from .parser.chunk import loadItems
 import ichier
 
 
@@ -47,6 +48,12 @@ def parse_arguments():
         action="store_true",
         help="Preserve progress bar after parsing",
     )
+    parse.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse the parsed results of unchanged files stored in this directory",
+    )
 
     command.add_parser(
         "version",
@@ -62,6 +69,7 @@ def load_file(
     file: Union[str, Path],
     format: Optional[Literal["spice", "verilog"]] = None,
     preserve_progress: bool = False,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Optional[ichier.Design]:
     if format is None:
         if ":" in str(file):
@@ -88,7 +96,7 @@ def load_file(
         raise ValueError(f"Unsupported format: {format}")
 
     try:
-        return loader(file, preserve_progress=preserve_progress)
+        return loader(file, preserve_progress=preserve_progress, cache_dir=cache_dir)
     except KeyboardInterrupt:
         return
     except FileNotFoundError as e:
@@ -100,14 +108,19 @@ try:
 
     def load_verilog(file, **kwargs) -> ichier.Design:
         PD = Daemon()
-        args_array = [(item, PD.msg_queue) for item in vparser.parseInclude(file=file)]
-        with Pool() as pool:
-            result = pool.starmap_async(vparser.worker, args_array)
-            PD.worker(clear=not kwargs.get("preserve_progress", False))
-            designs = result.get()
-        design = ichier.Design()
-        for d in designs:
-            design.includeOtherDesign(d)
+
+        def run(items: list) -> list:
+            args_array = [(item, PD.msg_queue) for item in items]
+            with Pool() as pool:
+                result = pool.starmap_async(vparser.worker, args_array)
+                PD.worker(clear=not kwargs.get("preserve_progress", False))
+                return result.get()
+
+        design = loadItems(
+            vparser.parseInclude(file=file),
+            run,
+            cache_dir=kwargs.get("cache_dir"),
+        )
         design.modules.rebuild(mute=True, verilog_style=True)
         path = Path(file)
         design.path = path
@@ -119,14 +132,19 @@ try:
 
     def load_spice(file, **kwargs) -> ichier.Design:
         PD = Daemon()
-        args_array = [(item, PD.msg_queue) for item in sparser.parseInclude(file=file)]
-        with Pool() as pool:
-            result = pool.starmap_async(sparser.worker, args_array)
-            PD.worker(clear=not kwargs.get("preserve_progress", False))
-            designs = result.get()
-        design = ichier.Design()
-        for d in designs:
-            design.includeOtherDesign(d)
+
+        def run(items: list) -> list:
+            args_array = [(item, PD.msg_queue) for item in items]
+            with Pool() as pool:
+                result = pool.starmap_async(sparser.worker, args_array)
+                PD.worker(clear=not kwargs.get("preserve_progress", False))
+                return result.get()
+
+        design = loadItems(
+            sparser.parseInclude(file=file),
+            run,
+            cache_dir=kwargs.get("cache_dir"),
+        )
         design.modules.rebuild(mute=True)
         path = Path(file)
         design.path = path
@@ -139,12 +157,12 @@ try:
 except ImportError:
 
     def load_verilog(file, **kwargs) -> ichier.Design:
-        design = fromVerilog(file)
+        design = fromVerilog(file, cache_dir=kwargs.get("cache_dir"))
         design.modules.rebuild(mute=True, verilog_style=True)
         return design
 
     def load_spice(file, **kwargs) -> ichier.Design:
-        design = fromSpice(file)
+        design = fromSpice(file, cache_dir=kwargs.get("cache_dir"))
         design.modules.rebuild(mute=True)
         return design
 
@@ -232,6 +250,7 @@ def main():
         design = load_file(
             file=args.file,
             preserve_progress=args.preserve_progress,
+            cache_dir=args.cache_dir,
         )
         if design is None:
             return
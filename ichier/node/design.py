@@ -1,9 +1,27 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, Optional, Literal, Tuple, Union
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Literal,
+    Tuple,
+    Union,
+)
+from itertools import islice
+import io
+import multiprocessing
+import os
 
 from . import obj
 from .fig import Fig, FigCollection
+from .module import FlatCounts
+from .storage import loadDesign, saveDesign
+from ..utils import openTextWriter
 
 __all__ = [
     "Design",
@@ -12,6 +30,15 @@ __all__ = [
 
 
 class Design(Fig):
+    __slots__ = (
+        "__modules",
+        "__parameters",
+        "__priority",
+        "__path",
+        "__counts",
+        "__version",
+    )
+
     def __init__(
         self,
         name: Optional[str] = None,
@@ -20,10 +47,20 @@ class Design(Fig):
         priority: Tuple[int, ...] = (),
     ) -> None:
         super().__init__(name)
+        self.__version = 0
         self.__modules = obj.ModuleCollection(self, modules)
         self.__parameters = obj.ParameterCollection(parameters)
         self.__priority = priority
         self.__path = None
+        self.__counts = FlatCounts()
+
+    @property
+    def _version(self) -> int:
+        return self.__version
+
+    def _touch(self) -> None:
+        """Mark a structural change of a module in the design."""
+        self.__version += 1
 
     @property
     def modules(self) -> obj.ModuleCollection:
@@ -87,19 +124,150 @@ class Design(Fig):
     def getTopLevelModules(self) -> Tuple[obj.Module, ...]:
         return self.modules.getTopLevels()
 
-    def dumpToSpice(self, *, width_limit: int = 88) -> str:
-        return "\n\n\n".join(
-            m.dumpToSpice(width_limit=width_limit) for m in self.modules
-        )
+    def getFlatCounts(self) -> Dict[str, Dict[str, Any]]:
+        """The flat counts of all modules keyed by name, see `Module.getFlatCounts`.
+
+        Computed bottom-up once for every module and cached until instances
+        or modules are changed, the result must be treated as read only.
+        """
+        return self.__counts.refresh(self)
+
+    def flattenNets(self, top: Optional[Union[str, obj.Module]] = None) -> obj.FlatNets:
+        """Flatten the nets under the top module, see `FlatNets`.
+
+        The top module defaults to the only top level module of the design.
+        """
+        if top is None:
+            tops = self.getTopLevelModules()
+            if len(tops) != 1:
+                raise ValueError(
+                    f"top module must be specified, {len(tops)} top level modules found"
+                )
+            top = tops[0]
+        elif isinstance(top, str):
+            top = self.modules[top]
+        return obj.FlatNets(top)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Save the design to a compact binary file, see `load`.
+
+        Names and parameter values are stored once in a string table and
+        referred to by index. Parameter values must be strings, numbers or
+        None, the `error` of an instance is saved as its text.
+        """
+        saveDesign(self, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Design:
+        """Load a design saved by `save`.
+
+        The file is memory-mapped and every module is decoded on first access
+        to its contents, so the file must not be changed until all modules are
+        loaded. It is closed after the last one.
+        """
+        return loadDesign(path)
+
+    def dumpToSpice(self, *, width_limit: int = 88, workers: int = 1) -> str:
+        """The SPICE netlist of all modules, see `writeSpice` for `workers`."""
+        f = io.StringIO()
+        self._writeSpice(f, width_limit, workers)
+        return f.getvalue()
+
+    def writeSpice(
+        self,
+        fp: Union[str, Path, IO],
+        *,
+        width_limit: int = 88,
+        workers: int = 1,
+    ) -> None:
+        """Write the same text as `dumpToSpice` module by module.
+
+        With `workers` other than 1, the modules are rendered by that many
+        processes, or one per CPU if 0, in chunks of about the same number of
+        instances, and written in the module order. The worker processes are
+        forked, it is serial where fork is not available.
+        """
+        with openTextWriter(fp) as f:
+            self._writeSpice(f, width_limit, workers)
+
+    def _writeSpice(self, f: IO[str], width_limit: int, workers: int = 1) -> None:
+        if workers != 1 and len(self.modules) > 1 and _canFork():
+            texts = _renderParallel(self, width_limit, workers or os.cpu_count() or 1)
+            for i, text in enumerate(texts):
+                if i:
+                    f.write("\n\n\n")
+                f.write(text)
+            return
+        for i, module in enumerate(self.modules):
+            if i:
+                f.write("\n\n\n")
+            module._writeSpice(f, width_limit)
+
+    def _writeVerilog(self, f: IO[str], width_limit: int) -> None:
+        ports: Dict[obj.Module, tuple] = {}  # 各个 master 的端口分组
+        for i, module in enumerate(self.modules):
+            if i:
+                f.write("\n\n")
+            module._writeVerilog(f, width_limit, ports)
+
+
+# 正在并行导出的设计，fork 出的子进程直接读取，不需要序列化
+_exporting: Optional[Design] = None
+
+
+def _canFork() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _exportChunks(modules: Iterable[obj.Module], count: int) -> List[Tuple[int, int]]:
+    """Split the modules into about `count` ranges of similar instance numbers."""
+    sizes = [len(m.instances) + 1 for m in modules]
+    target = sum(sizes) / count
+    chunks = []
+    start = total = 0
+    for i, size in enumerate(sizes):
+        total += size
+        if total >= target:
+            chunks.append((start, i + 1))
+            start, total = i + 1, 0
+    if start < len(sizes):
+        chunks.append((start, len(sizes)))
+    return chunks
+
+
+def _renderChunk(args: Tuple[int, int, int]) -> str:
+    start, stop, width_limit = args
+    f = io.StringIO()
+    modules = islice(_exporting.modules.values(), start, stop)
+    for i, module in enumerate(modules):
+        if i:
+            f.write("\n\n\n")
+        module._writeSpice(f, width_limit)
+    return f.getvalue()
+
+
+def _renderParallel(design: Design, width_limit: int, workers: int) -> Iterator[str]:
+    global _exporting
+    # 每个进程约 4 块，块的划分只取决于设计，结果按模块顺序返回
+    chunks = _exportChunks(design.modules, workers * 4)
+    _exporting = design
+    try:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            args = [(start, stop, width_limit) for start, stop in chunks]
+            yield from pool.imap(_renderChunk, args)
+    finally:
+        _exporting = None
 
 
 class DesignCollection(FigCollection):
+    __slots__ = ()
+
     def _valueChecker(self, value: Design) -> None:
         if not isinstance(value, Design):
             raise TypeError("value must be a Design")
 
     def __iter__(self) -> Iterator[Design]:
-        return iter(self.figs)
+        return iter(self.values())
 
     def __getitem__(self, key: Union[int, str]) -> Design:
         return super().__getitem__(key)
@@ -1,9 +1,26 @@
 from __future__ import annotations
-from typing import Any, Iterable, Iterator, Literal, Optional, Union
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+from bisect import bisect_left
+from functools import lru_cache
 from uuid import uuid4, UUID
+import fnmatch
+import io
 import re
 
 from . import obj
+from ..utils import openTextWriter
 
 __all__ = [
     "Fig",
@@ -14,12 +31,14 @@ __all__ = [
 
 
 class Fig:
-    __name: Optional[str] = None
-    __collection: Optional["FigCollection"] = None
+    __slots__ = ("__uuid", "__name", "__collection")
 
     def __init__(self, name: Optional[str] = None) -> None:
-        self.__uuid = uuid4()
-        self.name = name
+        if name is not None and not isinstance(name, str):
+            raise TypeError(f"name must be a string - {name!r}")
+        self.__uuid = None  # 首次访问时才生成
+        self.__name = name
+        self.__collection = None
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.name!r})"
@@ -33,6 +52,8 @@ class Fig:
 
     @property
     def uuid(self) -> UUID:
+        if self.__uuid is None:
+            self.__uuid = uuid4()
         return self.__uuid
 
     @property
@@ -43,13 +64,13 @@ class Fig:
 
     @name.setter
     def name(self, value: Optional[str]) -> None:
-        if value == self.name:
-            return
         if value is None:
             self.__name = None
             return
         if not isinstance(value, str):
             raise TypeError(f"name must be a string - {value!r}")
+        if value == self.__name:
+            return
         old = self.name
         self.__name = value
         if self.collection is not None:
@@ -65,7 +86,12 @@ class Fig:
     def _setCollection(self, value: Optional["FigCollection"]) -> None:
         if value is not None and not isinstance(value, FigCollection):
             raise TypeError(f"value must be a FigCollection or None - {value!r}")
+        old = self.__collection
         self.__collection = value
+        # 加入或移出集合都是结构改变，所在模块或设计的缓存随之失效
+        for collection in (old, value):
+            if collection is not None and collection.parent is not None:
+                collection.parent._touch()
 
     def getModule(self) -> Optional[obj.Module]:
         collection = self.collection
@@ -106,7 +132,42 @@ class Fig:
             " Please try to dump the parent node instead."
         )
 
-    def dumpToVerilog(self, *args, **kwargs) -> str:
+    def dumpToVerilog(self, *, width_limit: int = 88) -> str:
+        f = io.StringIO()
+        self._writeVerilog(f, width_limit)
+        return f.getvalue()
+
+    def writeSpice(
+        self,
+        fp: Union[str, Path, IO],
+        *,
+        width_limit: int = 88,
+    ) -> None:
+        """Write the same text as `dumpToSpice` piece by piece.
+
+        `fp` is a text or binary stream, or a path, which is gzip compressed
+        if it ends with ".gz". Lines are not wrapped if `width_limit` is 0.
+        """
+        with openTextWriter(fp) as f:
+            self._writeSpice(f, width_limit)
+
+    def _writeSpice(self, f: IO[str], width_limit: int) -> None:
+        f.write(self.dumpToSpice(width_limit=width_limit))
+
+    def writeVerilog(
+        self,
+        fp: Union[str, Path, IO],
+        *,
+        width_limit: int = 88,
+    ) -> None:
+        """Write the structural Verilog of `dumpToVerilog` piece by piece.
+
+        `fp` is the same as for `writeSpice`.
+        """
+        with openTextWriter(fp) as f:
+            self._writeVerilog(f, width_limit)
+
+    def _writeVerilog(self, f: IO[str], width_limit: int) -> None:
         raise NotImplementedError(
             f"Dump to verilog is disabled for the {self.__class__.__name__!r}."
             " Please try to dump the parent node instead."
@@ -114,6 +175,18 @@ class Fig:
 
 
 class Collection(dict):
+    __slots__ = ("__keys", "__where", "__holes", "__tree", "__sorted")
+
+    def __new__(cls, *args, **kwargs) -> "Collection":
+        # 反序列化时不会调用 __init__，在这里初始化
+        self = super().__new__(cls, *args, **kwargs)
+        self.__keys = None  # 按位置访问时才创建的键列表，与 dict 的顺序一致
+        self.__where = None  # 键在列表中的下标
+        self.__holes = 0  # 列表中已删除的键留下的空位 None
+        self.__tree = None  # 有空位时按位置查找的树状数组
+        self.__sorted = None  # 按前缀查找时才创建的有序键列表和键的位置
+        return self
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__()
         if args == (None,) and not kwargs:
@@ -154,8 +227,105 @@ class Collection(dict):
         pass
 
     def _dict__setitem__(self, key: str, value) -> None:
+        if key not in self:
+            if self.__keys is not None:
+                self.__where[key] = len(self.__keys)
+                self.__keys.append(key)  # 新的键总是添加在末尾
+                if self.__tree is not None:
+                    self.__treeAppend()
+            self.__sorted = None
         super().__setitem__(key, value)
 
+    def __forget(self, key: str) -> None:
+        self.__sorted = None
+        if self.__keys is None:
+            return
+        keys, tree = self.__keys, self.__tree
+        i = self.__where.pop(key)
+        if i == len(keys) - 1:
+            # 删除末尾的键，连同之前的空位一起去掉
+            keys.pop()
+            if tree is not None:
+                tree.pop()
+            while keys and keys[-1] is None:
+                keys.pop()
+                if tree is not None:
+                    tree.pop()
+                self.__holes -= 1
+            return
+        keys[i] = None  # 中间的键只留下空位
+        self.__holes += 1
+        if self.__holes * 2 > len(keys):
+            self.__keys = self.__where = self.__tree = None  # 空位过多，下次访问时重建
+            self.__holes = 0
+        elif tree is not None:
+            i += 1
+            while i < len(tree):
+                tree[i] -= 1
+                i += i & -i
+
+    def __positionKey(self, index: int) -> str:
+        if self.__keys is None:
+            self.__keys = list(self.keys())
+            self.__where = {key: i for i, key in enumerate(self.__keys)}
+            self.__holes = 0
+        keys = self.__keys
+        if not self.__holes:
+            return keys[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("collection index out of range")
+        if self.__tree is None:
+            # 有空位时用树状数组找到第 index 个键
+            tree = [0] + [0 if key is None else 1 for key in keys]
+            for i in range(1, len(tree)):
+                j = i + (i & -i)
+                if j < len(tree):
+                    tree[j] += tree[i]
+            self.__tree = tree
+        tree = self.__tree
+        pos, rest = 0, index + 1
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if pos + step < len(tree) and tree[pos + step] < rest:
+                pos += step
+                rest -= tree[pos]
+            step >>= 1
+        return keys[pos]
+
+    def __treeAppend(self) -> None:
+        # 新节点的值为自身加上它覆盖的前面区间之和
+        tree = self.__tree
+        n = len(tree)
+        value = 1
+        i = n - 1
+        stop = n - (n & -n)
+        while i > stop:
+            value += tree[i]
+            i -= i & -i
+        tree.append(value)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.__forget(key)
+
+    def pop(self, key: str, *args: Any) -> Any:
+        if key in self:
+            self.__forget(key)
+        return super().pop(key, *args)
+
+    def popitem(self) -> tuple:
+        item = super().popitem()
+        self.__forget(item[0])
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self.__keys = self.__where = self.__tree = None
+        self.__holes = 0
+        self.__sorted = None
+
     def __setitem__(self, key: str, value: Any) -> None:
         self._keyChecker(key)
         self._valueChecker(value)
@@ -163,7 +333,7 @@ class Collection(dict):
 
     def __getitem__(self, key: Union[int, str]) -> Any:
         if isinstance(key, int):
-            key = tuple(self.keys())[key]
+            key = self.__positionKey(key)
         elif isinstance(key, str):
             pass
         else:
@@ -218,25 +388,110 @@ class Collection(dict):
         ignorecase: bool = False,
         dict_result: bool = False,
         target: Literal["key", "value"] = "key",
+        mode: Literal["regex", "glob"] = "regex",
     ) -> Union[tuple, dict]:
-        if target not in ("key", "value"):
-            raise ValueError(f"target must be 'key' or 'value' - {target!r}")
-        result = {}
-        pattern = re.compile(name, flags=re.IGNORECASE if ignorecase else 0)
-        for key, value in self.items():
-            if target == "key":
-                s = key
-            elif target == "value":
-                s = str(value)
-            if pattern.fullmatch(s):
-                result[key] = value
+        result = dict(self.iterFind(name, ignorecase, target, mode))
         if dict_result:
             return result
         else:
             return tuple(result.values())
 
+    def iterFind(
+        self,
+        name: str,
+        ignorecase: bool = False,
+        target: Literal["key", "value"] = "key",
+        mode: Literal["regex", "glob"] = "regex",
+    ) -> Iterator[Tuple[str, Any]]:
+        """Yield the `(key, value)` pairs matching the pattern in the collection order.
+
+        The pattern is a regular expression or a shell glob (`mode="glob"`), which
+        must match the whole key, or the `str` of the value.
+        """
+        if target not in ("key", "value"):
+            raise ValueError(f"target must be 'key' or 'value' - {target!r}")
+        literal, prefix = _patternLiteral(name, mode)
+        if literal is not None and not ignorecase:
+            # 普通名称，不需要正则匹配
+            if target == "key":
+                if prefix:
+                    for key in self.__prefixKeys(literal):
+                        yield key, super().__getitem__(key)
+                elif literal in self:
+                    yield literal, super().__getitem__(literal)
+            else:
+                for key, value in self.items():
+                    s = str(value)
+                    if s.startswith(literal) if prefix else s == literal:
+                        yield key, value
+            return
+        fullmatch = _compilePattern(name, ignorecase, mode).fullmatch
+        if target == "key":
+            for key, value in self.items():
+                if fullmatch(key):
+                    yield key, value
+        else:
+            for key, value in self.items():
+                if fullmatch(str(value)):
+                    yield key, value
+
+    def __prefixKeys(self, prefix: str) -> List[str]:
+        # 在有序的键列表中二分查找，再按 dict 的顺序排列
+        if self.__sorted is None:
+            keys = sorted(self.keys())
+            position = {key: i for i, key in enumerate(self.keys())}
+            self.__sorted = keys, position
+        keys, position = self.__sorted
+        start = bisect_left(keys, prefix)
+        stop = start
+        while stop < len(keys) and keys[stop].startswith(prefix):
+            stop += 1
+        return sorted(keys[start:stop], key=position.__getitem__)
+
+
+@lru_cache(maxsize=256)
+def _compilePattern(name: str, ignorecase: bool, mode: str) -> re.Pattern:
+    if mode == "glob":
+        name = fnmatch.translate(name)
+    elif mode != "regex":
+        raise ValueError(f"mode must be 'regex' or 'glob' - {mode!r}")
+    return re.compile(name, flags=re.IGNORECASE if ignorecase else 0)
+
+
+_REGEX_SPECIAL = re.compile(r"[.^$*+?{}\[\]\\|()]")
+_GLOB_SPECIAL = re.compile(r"[*?\[]")
+
+
+@lru_cache(maxsize=256)
+def _patternLiteral(name: str, mode: str) -> Tuple[Optional[str], bool]:
+    """The literal text of a plain name or prefix pattern, and if it is a prefix."""
+    if mode == "glob":
+        special, any_tail = _GLOB_SPECIAL, "*"
+    elif mode == "regex":
+        special, any_tail = _REGEX_SPECIAL, ".*"
+    else:
+        raise ValueError(f"mode must be 'regex' or 'glob' - {mode!r}")
+    if not special.search(name):
+        return name, False
+    head = name[: -len(any_tail)]
+    if name.endswith(any_tail) and not special.search(head):
+        return head, True
+    return None, False
+
+
+# 总线成员的名称，例如 A[0] 和 A<0>
+_BUS_MEMBER = re.compile(r"(?P<name>.+)(?:\[(?P<bit>\d+)\]|<(?P<abit>\d+)>)")
+
 
 class FigCollection(Collection):
+    __slots__ = ("__parent", "__buses")
+
+    def __new__(cls, *args, **kwargs) -> "FigCollection":
+        self = super().__new__(cls, *args, **kwargs)
+        self.__parent = None  # 反序列化时先恢复元素，再恢复 parent
+        self.__buses = None  # 首次查询总线时才创建的索引
+        return self
+
     def __init__(
         self,
         parent: Union[obj.Module, obj.Design],
@@ -284,12 +539,60 @@ class FigCollection(Collection):
             del self[key]
         fig._setCollection(self)
         super()._dict__setitem__(key, fig)
+        self.__buses = None
 
     def __delitem__(self, key: str) -> None:
         if key not in self:
             raise KeyError(f"key not found - {key!r}")
         self[key]._setCollection(None)
         super().__delitem__(key)
+        self.__buses = None
+
+    def pop(self, *args: Any) -> Any:
+        if args and args[0] in self:
+            fig = super().pop(*args)
+            fig._setCollection(None)
+            self.__buses = None
+            return fig
+        return super().pop(*args)
+
+    def popitem(self) -> tuple:
+        item = super().popitem()
+        item[1]._setCollection(None)
+        self.__buses = None
+        return item
+
+    def getBusBits(
+        self,
+        name: str,
+        brackets: Literal["[]", "<>"] = "[]",
+    ) -> Tuple[Tuple[int, Fig], ...]:
+        """Get the `(bit, fig)` pairs of the bus members `name[bit]` or `name<bit>`.
+
+        The members are in the collection order. The index from the bus names to
+        the members is built on first use, and reset when figs are added or removed.
+        """
+        if brackets not in ("[]", "<>"):
+            raise ValueError(f"brackets must be '[]' or '<>' - {brackets!r}")
+        if self.__buses is None:
+            buses: Dict[Tuple[str, str], list] = {}
+            for key, fig in self.items():
+                if m := _BUS_MEMBER.fullmatch(key):
+                    if m.group("bit") is not None:
+                        member = (m.group("name"), "[]"), int(m.group("bit"))
+                    else:
+                        member = (m.group("name"), "<>"), int(m.group("abit"))
+                    buses.setdefault(member[0], []).append((member[1], fig))
+            self.__buses = {k: tuple(v) for k, v in buses.items()}
+        return self.__buses.get((name, brackets), ())
+
+    def getBus(
+        self,
+        name: str,
+        brackets: Literal["[]", "<>"] = "[]",
+    ) -> Tuple[Fig, ...]:
+        """Get the bus members `name[bit]` or `name<bit>` in the collection order."""
+        return tuple(fig for _, fig in self.getBusBits(name, brackets))
 
     def rename(self, src: str, dst: str) -> None:
         if src not in self:
@@ -304,11 +607,17 @@ class FigCollection(Collection):
         self.__setitem__(dst, fig)
 
     def __iter__(self) -> Iterator[Fig]:
-        return iter(self.figs)
+        """Iterate over the live figs without copying them.
+
+        Like a dict, adding or removing figs during the iteration raises
+        `RuntimeError`. Iterate over the `figs` snapshot to modify the collection.
+        """
+        return iter(self.values())
 
     def clear(self) -> None:
         for v in self.values():
             v._setCollection(None)
+        self.__buses = None
         return super().clear()
 
     def dump(self, *args, **kwargs) -> str:
@@ -316,6 +625,8 @@ class FigCollection(Collection):
 
 
 class OrderList(list):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__()
         if args == (None,) and not kwargs:
@@ -0,0 +1,190 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Optional, Tuple
+import sys
+
+from . import obj
+
+__all__ = [
+    "FlatNets",
+]
+
+
+class FlatNets:
+    """Electrically equivalent nets of a module, flattened through the hierarchy.
+
+    Every net of every module occurrence is a flat net, numbered in walking
+    order, and the connected flat nets share one node ID. `paths` holds the
+    instance path of every occurrence, `contexts` and `names` hold the
+    occurrence and the local name of every flat net, `nodes` its node ID.
+    Hierarchical names are joined with "/", e.g. "X0/X1/net".
+    """
+
+    def __init__(self, top: obj.Module) -> None:
+        if not isinstance(top, obj.Module):
+            raise TypeError("top must be a Module")
+        self.top = top
+        self.paths: List[str] = []
+        self.contexts = array("l")
+        self.names: List[str] = []
+        self.nodes = array("l")
+        self.__heads = array("l")  # 每个节点编号最小的线网，即层次最高的名称
+        self.__index: Optional[Dict[str, int]] = None
+        self.__order: Optional[array] = None
+        self.__starts: Optional[array] = None
+        self.__build()
+
+    def __repr__(self) -> str:
+        return f"FlatNets({self.top.name!r}, nodes={len(self)}, nets={len(self.names)})"
+
+    def __len__(self) -> int:
+        return len(self.__heads)
+
+    def __build(self) -> None:
+        parent = array("l")  # 并查集，根总是集合中编号最小的线网
+        contexts, names = self.contexts, self.names
+        intern = sys.intern
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(a: int, b: int) -> None:
+            a, b = find(a), find(b)
+            if a < b:
+                parent[b] = a
+            elif b < a:
+                parent[a] = b
+
+        owners = array("l", [-1])  # 每个实例路径的上一级，用于忽略递归例化
+        masters = [self.top]
+        self.paths.append("")
+        templates: Dict[obj.Module, tuple] = {}
+        # 待展开的模块：(路径编号, 模块, [(端口名, 上一级线网编号)])
+        stack: List[Tuple[int, obj.Module, list]] = [(0, self.top, [])]
+        while stack:
+            ctx, module, ports = stack.pop()
+            template = templates.get(module)
+            if template is None:
+                template = templates[module] = self.__compile(module)
+            local_names, local, insts = template
+
+            # 每个模块的线网连续编号
+            base = len(parent)
+            parent.extend(range(base, base + len(local_names)))
+            contexts.extend(array("l", [ctx]) * len(local_names))
+            names.extend(local_names)
+            for term, i in ports:
+                j = local.get(term)
+                if j is None:
+                    # 端口没有对应的线网，单独编号
+                    j = len(parent) - base
+                    parent.append(base + j)
+                    contexts.append(ctx)
+                    names.append(intern(term))
+                union(i, base + j)
+
+            children = []
+            path = self.paths[ctx]
+            for name, master, sub_ports in insts:
+                if self.__isAncestor(master, ctx, owners, masters):
+                    continue
+                sub = len(self.paths)
+                self.paths.append(f"{path}/{name}" if path else name)
+                owners.append(ctx)
+                masters.append(master)
+                children.append((sub, master, [(t, base + i) for t, i in sub_ports]))
+            stack.extend(reversed(children))
+
+        # 压缩为连续的节点编号，根的编号总小于成员
+        nodes, heads = self.nodes, self.__heads
+        for i in range(len(parent)):
+            root = find(i)
+            if root == i:
+                nodes.append(len(heads))
+                heads.append(i)
+            else:
+                nodes.append(nodes[root])
+
+    @staticmethod
+    def __compile(module: obj.Module) -> tuple:
+        # 每个模块只分析一次：局部线网名称，以及子模块端口连接的局部线网序号
+        local = {name: i for i, name in enumerate(module.nets.keys())}
+        insts = []
+        for inst in module.instances:
+            master = inst.reference.getMaster()
+            connection = inst.connection
+            if isinstance(connection, dict):
+                pairs = connection.items()
+            else:
+                pairs = enumerate(connection)
+            ports = []
+            for term, n in pairs:
+                if n is None:
+                    continue  # 悬空连接
+                if not isinstance(n, str):
+                    raise ValueError(
+                        f"{n!r} is not a scalar string, "
+                        "maybe you need to rebuild the connection."
+                    )
+                i = local.setdefault(n, len(local))
+                if master is None:
+                    continue
+                if isinstance(term, int):
+                    if term >= len(master.terminals):
+                        continue
+                    term = master.terminals[term].name
+                ports.append((term, i))
+            if master is not None:
+                insts.append((inst.name, master, ports))
+        return tuple(sys.intern(name) for name in local), local, insts
+
+    @staticmethod
+    def __isAncestor(
+        master: obj.Module,
+        ctx: int,
+        owners: array,
+        masters: List[obj.Module],
+    ) -> bool:
+        while ctx >= 0:
+            if masters[ctx] is master:
+                return True
+            ctx = owners[ctx]
+        return False
+
+    def getFlatName(self, index: int) -> str:
+        """The hierarchical name of the flat net."""
+        path = self.paths[self.contexts[index]]
+        name = self.names[index]
+        return f"{path}/{name}" if path else name
+
+    def getNode(self, name: str) -> int:
+        """The node ID of the hierarchical net name."""
+        if self.__index is None:
+            self.__index = {self.getFlatName(i): i for i in range(len(self.names))}
+        try:
+            return self.nodes[self.__index[name]]
+        except KeyError:
+            raise KeyError(f"net {name!r} not found in {self.top.name!r}") from None
+
+    def getName(self, node: int) -> str:
+        """The highest hierarchical name of the node."""
+        return self.getFlatName(self.__heads[node])
+
+    def getMembers(self, node: int) -> Tuple[str, ...]:
+        """All hierarchical names of the node, the highest first."""
+        if self.__order is None:
+            # 按节点排序一次，之后每个节点的成员都是连续的一段
+            order = array(
+                "l", sorted(range(len(self.nodes)), key=self.nodes.__getitem__)
+            )
+            starts = array("l", [0] * (len(self) + 1))
+            for n in self.nodes:
+                starts[n + 1] += 1
+            for n in range(len(self)):
+                starts[n + 1] += starts[n]
+            self.__order, self.__starts = order, starts
+        start, stop = self.__starts[node], self.__starts[node + 1]
+        return tuple(self.getFlatName(i) for i in self.__order[start:stop])
@@ -1,12 +1,24 @@
 from __future__ import annotations
-from typing import Any, Dict, Iterator, Optional, Sequence, Tuple, Union, overload
-from textwrap import wrap
+from typing import IO, Any, Dict, Iterator, Optional, Sequence, Tuple, Union, overload
 from copy import deepcopy
 
 from icutk.log import getLogger
 
 from . import obj
 from .fig import Fig, FigCollection, Collection, OrderList
+from .parameter import ParameterCollection
+from .verilog import (
+    groupBits,
+    groupNames,
+    instanceNets,
+    memberName,
+    moduleNames,
+    portGroups,
+    portIds,
+    portMembers,
+    verilogId,
+    verilogValue,
+)
 from .trace import (
     traceByInstTermName,
     traceByInstTermOrder,
@@ -14,7 +26,7 @@ from .trace import (
     ConnectByOrder,
     ConnectType,
 )
-from ..utils import flattenSequence, expandTermNetPairs
+from ..utils import flattenSequence, expandTermNetPairs, wrapTokens
 
 __all__ = [
     "Instance",
@@ -25,7 +37,48 @@ __all__ = [
 ]
 
 
+class _NoParameters(ParameterCollection):
+    """The immutable empty parameters shared by the instances."""
+
+    __slots__ = ()
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        raise TypeError("shared empty parameters is immutable")
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("shared empty parameters is immutable")
+
+    def pop(self, *args: Any) -> Any:
+        raise TypeError("shared empty parameters is immutable")
+
+    def popitem(self) -> Any:
+        raise TypeError("shared empty parameters is immutable")
+
+    def clear(self) -> None:
+        raise TypeError("shared empty parameters is immutable")
+
+    def __reduce__(self) -> str:
+        return "_NO_PARAMETERS"  # 反序列化后仍是同一个对象
+
+
+# 没有参数的实例共用这两个不可变的空容器，首次通过属性访问时才创建各自的容器
+_NO_PARAMETERS = _NoParameters()
+_NO_ORDERPARAMS: Tuple[str, ...] = ()
+
+_MISSING = object()  # 连接中没有的端口
+
+
 class Instance(Fig):
+    __slots__ = (
+        "__reference",
+        "__connection",
+        "__parameters",
+        "__orderparams",
+        "__prefix",
+        "__raw",
+        "error",
+    )
+
     def __init__(
         self,
         reference: Optional[str],
@@ -43,8 +96,14 @@ class Instance(Fig):
         if connection is None:
             connection = {}
         self.connection = connection
-        self.__parameters = obj.ParameterCollection(parameters)
-        self.__orderparams = obj.OrderParameters(orderparams)
+        if parameters:
+            self.__parameters = obj.ParameterCollection(parameters)
+        else:
+            self.__parameters = _NO_PARAMETERS
+        if orderparams:
+            self.__orderparams = obj.OrderParameters(orderparams)
+        else:
+            self.__orderparams = _NO_ORDERPARAMS
         self.__prefix = prefix
         self.__raw = raw
         self.error = error
@@ -56,12 +115,17 @@ class Instance(Fig):
 
     @reference.setter
     def reference(self, value: Optional[str]) -> None:
+        if self.collection is not None:
+            self.collection._countReference(self, -1)
         if value is None:
             self.__reference = obj.Unknown(instance=self)
         elif isinstance(value, obj.DesignateReference):
             self.__reference = obj.DesignateReference(value, instance=self)
         else:
             self.__reference = obj.Reference(value, instance=self)
+        if self.collection is not None:
+            self.collection._countReference(self, 1)
+            self.collection.parent._touch()
 
     @property
     def connection(self) -> Union[ConnectionPair, ConnectionList]:
@@ -72,10 +136,11 @@ class Instance(Fig):
         self,
         value: Optional[Union[Dict[str, Any], Sequence[Any]]],
     ) -> None:
+        if self.collection is not None:
+            self.collection._resetConnects()
         if value is None:
             self.__connection = ConnectionPair()
-            return
-        if isinstance(value, dict):
+        elif isinstance(value, dict):
             connect = {}
             for term, net_info in value.items():
                 if not isinstance(term, str):
@@ -98,6 +163,7 @@ class Instance(Fig):
             self.__connection = ConnectionList(connect)
         else:
             raise TypeError("connection must be a dict or a sequence")
+        self.__connection._setOwner(self)
 
     def getAssocNets(self) -> Tuple[obj.Net, ...]:
         """Get the nets associated with the instance in the module."""
@@ -121,10 +187,14 @@ class Instance(Fig):
 
     @property
     def parameters(self) -> obj.ParameterCollection:
+        if self.__parameters is _NO_PARAMETERS:
+            self.__parameters = obj.ParameterCollection()
         return self.__parameters
 
     @property
     def orderparams(self) -> obj.OrderParameters:
+        if self.__orderparams is _NO_ORDERPARAMS:
+            self.__orderparams = obj.OrderParameters()
         return self.__orderparams
 
     @property
@@ -139,6 +209,16 @@ class Instance(Fig):
         if value is not None and not isinstance(value, str):
             raise TypeError("prefix must be a string")
         self.__prefix = value
+        if self.collection is not None and self.collection.parent is not None:
+            self.collection.parent._touch()
+
+    def _saveState(self) -> Tuple[Optional[str], Dict[str, Any], Sequence[str]]:
+        """The prefix, parameters and order parameters as stored, for `Design.save`.
+
+        The prefix is None if it follows the master, the parameters may be the
+        shared empty ones and must not be changed.
+        """
+        return self.__prefix, self.__parameters, self.__orderparams
 
     @property
     def raw(self) -> Optional[str]:
@@ -151,9 +231,9 @@ class Instance(Fig):
     def __call__(self, key: Union[str, int]) -> Any:
         try:
             if isinstance(key, str):
-                return self.parameters[key]
+                return self.__parameters[key]
             elif isinstance(key, int):
-                return self.orderparams[key]
+                return self.__orderparams[key]
             else:
                 raise TypeError(f"key must be a str or an int - {key!r}")
         except KeyError:
@@ -195,8 +275,8 @@ class Instance(Fig):
             reference=ref,
             name=name,
             connection=deepcopy(self.connection),
-            parameters=deepcopy(self.parameters),
-            orderparams=deepcopy(self.orderparams),
+            parameters=deepcopy(self.__parameters) if self.__parameters else None,
+            orderparams=list(self.__orderparams),
             raw=self.raw,
             error=deepcopy(self.error),
         )
@@ -250,8 +330,8 @@ class Instance(Fig):
                                 and net_desc.isidentifier()
                             ):
                                 # 参考 Verilog 语法风格，且连接描述的可能是总线连接
-                                if terms := master.terminals.find(rf"{term}\[\d+\]"):
-                                    if nets := master.nets.find(rf"{net_desc}\[\d+\]"):
+                                if terms := master.terminals.getBus(term):
+                                    if nets := master.nets.getBus(net_desc):
                                         # 模块内已有 net 参考
                                         connect.update(expandTermNetPairs(terms, nets))
                                     else:
@@ -278,7 +358,7 @@ class Instance(Fig):
                             if module is None:
                                 # 不属于任意 module
                                 connect[term] = net_desc
-                            elif nets := module.nets.find(rf"{net_desc}\[\d+\]"):
+                            elif nets := module.nets.getBus(net_desc):
                                 # 在 module 中这个 net 属于一组总线
                                 connect.update(expandTermNetPairs(term, nets))
                             else:
@@ -292,7 +372,7 @@ class Instance(Fig):
                             "single-multiple connection only supported in Verilog style"
                         )
                     if master:
-                        result = master.terminals.find(rf"{term}\[\d+\]")
+                        result = master.terminals.getBus(term)
                         if not result:
                             raise ValueError(
                                 f"term bus type {term!r} not found in module {master.name!r}"
@@ -326,7 +406,7 @@ class Instance(Fig):
                 else:
                     connect = []
                     for net_desc in self.connection:
-                        if nets := module.nets.find(rf"{net_desc}\[\d+\]"):
+                        if nets := module.nets.getBus(net_desc):
                             # 匹配到总线描述，拓展该链接
                             connect.extend(map(str, nets))
                         else:
@@ -356,19 +436,19 @@ class Instance(Fig):
             else:  # ConnectionList
                 tokens += self.connection
             tokens.append(f"$[{self.reference.name}]")
-            if self.orderparams:
-                tokens.append(self.orderparams.dumpToSpice())
-            if self.parameters:
-                tokens.append(self.parameters.dumpToSpice())
+            if self.__orderparams:
+                tokens.append(self.__orderparams.dumpToSpice())
+            if self.__parameters:
+                tokens.append(self.__parameters.dumpToSpice())
         else:  # Reference
             if isinstance(self.connection, ConnectionPair):
-                if self.parameters or self.orderparams:
+                if self.__parameters or self.__orderparams:
                     tokens += self.connection.values()
                     tokens.append(self.reference.name)
-                    if self.orderparams:
-                        tokens.append(self.orderparams.dumpToSpice())
-                    if self.parameters:
-                        tokens.append(self.parameters.dumpToSpice())
+                    if self.__orderparams:
+                        tokens.append(self.__orderparams.dumpToSpice())
+                    if self.__parameters:
+                        tokens.append(self.__parameters.dumpToSpice())
                 else:
                     tokens += ["/", self.reference.name, "$PINS"]
                     for term, net in self.connection.items():
@@ -378,26 +458,179 @@ class Instance(Fig):
             else:  # ConnectionList
                 tokens += self.connection
                 tokens += ["/", self.reference.name]
-                if self.orderparams:
-                    tokens.append(self.orderparams.dumpToSpice())
-                if self.parameters:
-                    tokens.append(self.parameters.dumpToSpice())
-        return "\n".join(
-            wrap(
-                " ".join(tokens),
-                width=width_limit,
-                subsequent_indent="+ ",
+                if self.__orderparams:
+                    tokens.append(self.__orderparams.dumpToSpice())
+                if self.__parameters:
+                    tokens.append(self.__parameters.dumpToSpice())
+        return wrapTokens(" ".join(tokens), width_limit)
+
+    def _writeVerilog(self, f: IO[str], width_limit: int) -> None:
+        module = self.getModule()
+        ports: Dict[obj.Module, tuple] = {}
+        if module is None:
+            names: Dict[str, str] = {}
+            groupNames(groupBits(dict.fromkeys(instanceNets(self))), names)
+        else:
+            names = moduleNames(module, ports)
+        f.write(self._verilogLine(names, ports, width_limit))
+
+    def _verilogLine(
+        self,
+        names: Dict[str, str],
+        ports: Dict[obj.Module, tuple],
+        width_limit: int,
+    ) -> str:
+        # names 为所在模块的线网名称到 Verilog 表达式的映射
+        if isinstance(self.reference, obj.Unknown):
+            if self.raw is None:
+                raise ValueError("raw must be set when reference is unknown")
+            return "\n".join(f"  // {line}" for line in self.raw.splitlines())
+
+        def expr(net: Any) -> str:
+            if net is None:
+                return ""
+            if isinstance(net, (list, tuple)):
+                return "{" + ", ".join(expr(n) or "1'bz" for n in net) + "}"
+            return names.get(net) or verilogId(net)
+
+        master = self.reference.getMaster()
+        groups = [] if master is None else portGroups(master, ports)
+        connection = self.connection
+        items = []
+        if isinstance(connection, ConnectionPair):
+            if master is not None:
+                ids = portIds(master, ports)
+                covered = portMembers(master, ports)
+                rest = [term for term in connection if term not in covered]
+            else:
+                ids = []
+                rest = list(connection)
+            if rest:
+                # 不是 master 端口的连接
+                extra = groupBits(rest)
+                groups = groups + extra
+                ids = ids + [verilogId(head) for head, _, _ in extra]
+            for (head, brackets, bits), port in zip(groups, ids):
+                net = dict.get(connection, head, _MISSING)
+                if net is not _MISSING:
+                    pass  # 标量或未展开的总线连接
+                elif brackets is None:
+                    continue
+                else:
+                    net = [connection.get(memberName(head, brackets, b)) for b in bits]
+                    if all(n is None for n in net):
+                        continue
+                items.append(f".{port}({expr(net)})")
+        else:  # ConnectionList，按 master 的端口分组
+            nets = list(connection)
+            start = 0
+            for _, _, bits in groups:
+                if start >= len(nets):
+                    break
+                if bits:
+                    items.append(expr(nets[start : start + len(bits)]))
+                    start += len(bits)
+                else:
+                    items.append(expr(nets[start]))
+                    start += 1
+            items.extend(expr(net) for net in nets[start:])
+
+        params = ""
+        if self.__parameters:
+            params = ", ".join(
+                f".{verilogId(k)}({verilogValue(v)})"
+                for k, v in self.__parameters.items()
             )
+            params = f" #({params})"
+        elif self.__orderparams:
+            params = f" #({', '.join(map(verilogValue, self.__orderparams))})"
+        text = (
+            f"{verilogId(self.reference.name)}{params} {verilogId(self.name)}"
+            f" ({', '.join(items)});"
         )
+        return wrapTokens(text, width_limit, indent="    ", initial="  ")
 
 
 class InstanceCollection(FigCollection):
+    __slots__ = ("__connects",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.__connects = None
+        super().__init__(*args, **kwargs)
+
     def _valueChecker(self, fig: Instance) -> None:
         if not isinstance(fig, Instance):
             raise TypeError("fig must be an Instance object")
 
+    def __setitem__(self, key: str, fig: Instance) -> None:
+        super().__setitem__(key, fig)
+        self._resetConnects()
+        self._countReference(fig, 1)
+
+    def __delitem__(self, key: str) -> None:
+        inst = dict.get(self, key)
+        super().__delitem__(key)
+        self._resetConnects()
+        self._countReference(inst, -1)
+
+    def pop(self, *args: Any) -> Any:
+        inst = dict.get(self, args[0]) if args else None
+        result = super().pop(*args)
+        self._resetConnects()
+        if inst is not None:
+            self._countReference(inst, -1)
+        return result
+
+    def popitem(self) -> tuple:
+        item = super().popitem()
+        self._resetConnects()
+        self._countReference(item[1], -1)
+        return item
+
+    def clear(self) -> None:
+        for inst in self.values():
+            self._countReference(inst, -1)
+        super().clear()
+        self._resetConnects()
+
+    def _countReference(self, inst: Instance, delta: int) -> None:
+        # 更新所在设计的引用关系，占位的 Unknown 不算引用
+        module = self.parent
+        modules = None if module is None else module.collection
+        if isinstance(modules, obj.ModuleCollection) and not isinstance(
+            inst.reference, obj.Unknown
+        ):
+            modules._countReference(module, inst.reference.name, delta)
+
+    def _resetConnects(self) -> None:
+        self.__connects = None
+        if self.parent is not None:
+            self.parent._touch()  # 连接关系改变，缓存的 Route 随之失效
+
+    def getNetConnects(self, net: str) -> Tuple[Tuple[Instance, Union[str, int]], ...]:
+        """Get the `(instance, term name or order)` pairs connected to the net.
+
+        The reverse index of the connections is built on first use, and reset when
+        the instances are added, removed, or their `connection` is changed.
+        """
+        if self.__connects is None:
+            connects: Dict[str, list] = {}
+            for inst in self:
+                connection = inst.connection
+                if isinstance(connection, dict):
+                    pairs = connection.items()
+                elif isinstance(connection, list):
+                    pairs = enumerate(connection)
+                else:
+                    raise TypeError(f"Invalid connection type {type(connection)}")
+                for term, n in pairs:
+                    if isinstance(n, str):
+                        connects.setdefault(n, []).append((inst, term))
+            self.__connects = {k: tuple(v) for k, v in connects.items()}
+        return self.__connects.get(net, ())
+
     def __iter__(self) -> Iterator[Instance]:
-        return iter(self.figs)
+        return iter(self.values())
 
     def __getitem__(self, key: Union[int, str]) -> Instance:
         return super().__getitem__(key)
@@ -430,12 +663,120 @@ class InstanceCollection(FigCollection):
             fig.rebuild(mute=mute, verilog_style=verilog_style)
 
 
+def _resetOwnerConnects(owner: Optional[Instance]) -> None:
+    # 原地修改连接关系时，重置所在 InstanceCollection 的索引
+    if owner is not None and owner.collection is not None:
+        owner.collection._resetConnects()
+
+
 class ConnectionPair(Collection):
-    pass
+    __slots__ = ("__owner",)
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> ConnectionPair:
+        # 反序列化时不会调用 __init__，在这里初始化
+        self = super().__new__(cls, *args, **kwargs)
+        self.__owner = None
+        return self
+
+    def _setOwner(self, owner: Optional[Instance]) -> None:
+        self.__owner = owner
+
+    def __copy__(self) -> ConnectionPair:
+        return ConnectionPair(self)
+
+    def __deepcopy__(self, memo: dict) -> ConnectionPair:
+        return ConnectionPair(deepcopy(dict(self), memo))
+
+    def _dict__setitem__(self, key: str, value: Any) -> None:
+        super()._dict__setitem__(key, value)
+        _resetOwnerConnects(self.__owner)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        _resetOwnerConnects(self.__owner)
+
+    def pop(self, *args: Any) -> Any:
+        value = super().pop(*args)
+        _resetOwnerConnects(self.__owner)
+        return value
+
+    def popitem(self) -> tuple:
+        item = super().popitem()
+        _resetOwnerConnects(self.__owner)
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        _resetOwnerConnects(self.__owner)
 
 
 class ConnectionList(OrderList):
-    pass
+    __slots__ = ("__owner",)
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> ConnectionList:
+        self = super().__new__(cls, *args, **kwargs)
+        self.__owner = None
+        return self
+
+    def _setOwner(self, owner: Optional[Instance]) -> None:
+        self.__owner = owner
+
+    def __copy__(self) -> ConnectionList:
+        return ConnectionList(self)
+
+    def __deepcopy__(self, memo: dict) -> ConnectionList:
+        return ConnectionList(deepcopy(list(self), memo))
+
+    def __setitem__(self, *args: Any) -> None:
+        super().__setitem__(*args)
+        _resetOwnerConnects(self.__owner)
+
+    def __delitem__(self, *args: Any) -> None:
+        super().__delitem__(*args)
+        _resetOwnerConnects(self.__owner)
+
+    def __iadd__(self, other: Any) -> ConnectionList:
+        result = super().__iadd__(other)
+        _resetOwnerConnects(self.__owner)
+        return result
+
+    def __imul__(self, other: Any) -> ConnectionList:
+        result = super().__imul__(other)
+        _resetOwnerConnects(self.__owner)
+        return result
+
+    def append(self, *args: Any) -> None:
+        super().append(*args)
+        _resetOwnerConnects(self.__owner)
+
+    def extend(self, *args: Any) -> None:
+        super().extend(*args)
+        _resetOwnerConnects(self.__owner)
+
+    def insert(self, *args: Any) -> None:
+        super().insert(*args)
+        _resetOwnerConnects(self.__owner)
+
+    def pop(self, *args: Any) -> Any:
+        value = super().pop(*args)
+        _resetOwnerConnects(self.__owner)
+        return value
+
+    def remove(self, *args: Any) -> None:
+        super().remove(*args)
+        _resetOwnerConnects(self.__owner)
+
+    def clear(self) -> None:
+        super().clear()
+        _resetOwnerConnects(self.__owner)
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        _resetOwnerConnects(self.__owner)
+
+    def reverse(self) -> None:
+        super().reverse()
+        _resetOwnerConnects(self.__owner)
 
 
 class InstanceHierPath(list):
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import (
+    IO,
     Any,
+    Callable,
     DefaultDict,
     Dict,
     Iterable,
@@ -13,20 +15,48 @@ from typing import (
     Union,
 )
 from collections import defaultdict
-from textwrap import wrap
+import io
 
 from icutk.log import getLogger
 
 from . import obj
 from .fig import Fig, FigCollection
+from .trace import RouteCache
+from .verilog import (
+    groupNames,
+    memberName,
+    portGroups,
+    rangeText,
+    verilogId,
+    verilogValue,
+    wireGroups,
+)
+from ..utils import wrapTokens
 
 __all__ = [
     "Module",
     "ModuleCollection",
 ]
 
+# 按实例名前缀统计的基本器件
+_DEVICE_PREFIXES = "MRCDLQ"
+
 
 class Module(Fig):
+    __slots__ = (
+        "__terminals",
+        "__nets",
+        "__instances",
+        "__parameters",
+        "__specparams",
+        "__prefix",
+        "__lienno",
+        "__path",
+        "__routes",
+        "__version",
+        "__source",
+    )
+
     def __init__(
         self,
         name: Optional[str] = None,
@@ -38,6 +68,7 @@ class Module(Fig):
         prefix: str = "X",
     ) -> None:
         super().__init__(name)
+        self.__version = 0
         self.__terminals = obj.TerminalCollection(self, terminals)
         self.__nets = obj.NetCollection(self, nets)
         self.__instances = obj.InstanceCollection(self, instances)
@@ -46,25 +77,75 @@ class Module(Fig):
         self.__prefix = prefix
         self.__lienno = None
         self.__path = None
+        self.__routes = RouteCache()
+        self.__source = None
+
+    @property
+    def _version(self) -> int:
+        return self.__version
+
+    def _touch(self) -> None:
+        """Mark a structural change of the module and of its design."""
+        self.__version += 1
+        design = self.getDesign()
+        if design is not None:
+            design._touch()
+
+    @property
+    def _routes(self) -> RouteCache:
+        return self.__routes
+
+    def _setSource(self, source: Optional[Callable[[], tuple]]) -> None:
+        """Load the contents of the module from the source on first access.
+
+        The source returns the terminals, nets, instances, parameters and
+        specparams of the module, see `Design.load`.
+        """
+        self.__source = source
+
+    def __materialize(self) -> None:
+        source, self.__source = self.__source, None
+        terminals, nets, instances, parameters, specparams = source()
+        self.__terminals.extend(terminals)
+        self.__nets.extend(nets)
+        self.__instances.extend(instances)
+        self.__parameters.update(parameters)
+        self.__specparams.update(specparams)
+
+    def __reduce_ex__(self, protocol: int) -> Any:
+        # 未加载的模块先加载，源文件不随对象保存
+        if self.__source is not None:
+            self.__materialize()
+        return super().__reduce_ex__(protocol)
 
     @property
     def terminals(self) -> obj.TerminalCollection:
+        if self.__source is not None:
+            self.__materialize()
         return self.__terminals
 
     @property
     def instances(self) -> obj.InstanceCollection:
+        if self.__source is not None:
+            self.__materialize()
         return self.__instances
 
     @property
     def nets(self) -> obj.NetCollection:
+        if self.__source is not None:
+            self.__materialize()
         return self.__nets
 
     @property
     def parameters(self) -> obj.ParameterCollection:
+        if self.__source is not None:
+            self.__materialize()
         return self.__parameters
 
     @property
     def specparams(self) -> obj.SpecifyParameters:
+        if self.__source is not None:
+            self.__materialize()
         return self.__specparams
 
     @property
@@ -76,6 +157,7 @@ class Module(Fig):
         if not isinstance(value, str):
             raise TypeError("prefix must be a string")
         self.__prefix = value
+        self._touch()  # 未指定前缀的实例随之改变
 
     @property
     def lineno(self) -> Optional[int]:
@@ -115,10 +197,30 @@ class Module(Fig):
                 "nets": self.nets.summary(),
                 "parameters": self.parameters.summary(),
                 "specparams": self.specparams.summary(),
+                "flat": self.getFlatCounts(),
             }
         else:
             raise ValueError("type must be 'compact' or 'detail'")
 
+    def getFlatCounts(self) -> Dict[str, Any]:
+        """The counts of the instances under the module, flattened through hierarchy.
+
+        `instances` is the number of flat leaf instances, the ones without a
+        master in the design. `references` counts the flat instances of every
+        reference at all levels, `devices` the leaf instances by their primitive
+        prefix M, R, C, D, L or Q. See `Design.getFlatCounts`.
+        """
+        design = self.getDesign()
+        if design is None:
+            return countFlat((self,))[self.name]
+        counts = design.getFlatCounts()[self.name]
+        # 返回副本，不影响设计缓存的结果
+        return {
+            "instances": counts["instances"],
+            "references": dict(counts["references"]),
+            "devices": dict(counts["devices"]),
+        }
+
     def rebuild(
         self,
         *,
@@ -221,13 +323,15 @@ class Module(Fig):
         return module
 
     def dumpToSpice(self, *, width_limit: int = 88) -> str:
+        f = io.StringIO()
+        self._writeSpice(f, width_limit)
+        return f.getvalue()
+
+    def _writeSpice(self, f: IO[str], width_limit: int) -> None:
         # head
-        head = "\n".join(
-            wrap(
-                " ".join([".SUBCKT", self.name, *[t.name for t in self.terminals]]),
-                width=width_limit,
-                subsequent_indent="+ ",
-            )
+        head = wrapTokens(
+            " ".join([".SUBCKT", self.name, *[t.name for t in self.terminals]]),
+            width_limit,
         )
 
         # pininfo items
@@ -242,30 +346,175 @@ class Module(Fig):
                 pair.append("B")
             pin_pairs.append(":".join(pair))
 
-        pininfo = "\n".join(
-            wrap(
-                " ".join(pin_pairs),
-                width=width_limit,
-                initial_indent="*.PININFO ",
-                subsequent_indent="*.PININFO ",
-            )
+        pininfo = wrapTokens(
+            " ".join(pin_pairs),
+            width_limit,
+            indent="*.PININFO ",
+            initial="*.PININFO ",
         )
 
-        # instance items
-        insts = "\n".join(
-            i.dumpToSpice(width_limit=width_limit) for i in self.instances
-        )
+        f.write(head)
+        if pininfo:
+            f.write("\n" + pininfo)
+
+        # instance items, 逐个写入而不拼接整个模块
+        instances = self.instances
+        for inst in instances:
+            text = inst.dumpToSpice(width_limit=width_limit)
+            if text or len(instances) > 1:
+                f.write("\n" + text)
+        f.write("\n.ENDS")
+
+    def _writeVerilog(
+        self,
+        f: IO[str],
+        width_limit: int,
+        ports: Optional[Dict[Module, tuple]] = None,
+    ) -> None:
+        # ports 缓存各个 master 的端口分组，写整个设计时共用
+        if ports is None:
+            ports = {}
+        groups = portGroups(self, ports)
+        wires = wireGroups(self, groups)
+        names: Dict[str, str] = {}
+        groupNames(groups, names)
+        groupNames(wires, names)
+
+        # head
+        name = verilogId(self.name)
+        if groups:
+            heads = ", ".join(verilogId(head) for head, _, _ in groups)
+            f.write(wrapTokens(f"module {name} ({heads});", width_limit, "    "))
+        else:
+            f.write(f"module {name};")
+
+        # declarations
+        terminals = self.terminals
+        for head, brackets, bits in groups:
+            if bits:
+                term = terminals[memberName(head, brackets, bits[0])]
+                f.write(f"\n  {term.direction} {rangeText(bits)} {verilogId(head)};")
+            else:
+                f.write(f"\n  {terminals[head].direction} {verilogId(head)};")
+        for head, _, bits in wires:
+            if bits:
+                f.write(f"\n  wire {rangeText(bits)} {verilogId(head)};")
+            else:
+                f.write(f"\n  wire {names[head]};")
+        for key, value in self.parameters.items():
+            f.write(f"\n  parameter {verilogId(key)} = {verilogValue(value)};")
+        if self.specparams:
+            f.write("\n  specify")
+            for key, value in self.specparams.items():
+                f.write(f"\n    specparam {verilogId(key)} = {verilogValue(value)};")
+            f.write("\n  endspecify")
 
-        return "\n".join(x for x in [head, pininfo, insts, ".ENDS"] if x != "")
+        # instance items, 逐个写入而不拼接整个模块
+        for inst in self.instances:
+            f.write("\n" + inst._verilogLine(names, ports, width_limit))
+        f.write("\nendmodule")
 
 
 class ModuleCollection(FigCollection):
+    __slots__ = ("__refs", "__uses", "__inner")
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> ModuleCollection:
+        # 反序列化时不会调用 __init__，在这里初始化
+        self = super().__new__(cls, *args, **kwargs)
+        self.__refs = None  # 首次查询时才建立的引用关系
+        self.__uses = None
+        self.__inner = None
+        return self
+
     def _valueChecker(self, value: Module) -> None:
         if not isinstance(value, Module):
             raise TypeError("value must be a Module")
 
+    # 引用关系按集合的键记录：改名时模块的 name 已经是新名称，
+    # 先以旧键移出，再以新键加入
+    def __setitem__(self, key: str, fig: Module) -> None:
+        super().__setitem__(key, fig)
+        if self.__refs is not None:
+            self.__join(key, fig)
+
+    def __delitem__(self, key: str) -> None:
+        module = dict.get(self, key)
+        super().__delitem__(key)
+        if self.__refs is not None:
+            self.__leave(key, module)
+
+    def pop(self, *args: Any) -> Any:
+        module = dict.get(self, args[0]) if args else None
+        result = super().pop(*args)
+        if self.__refs is not None and module is not None:
+            self.__leave(args[0], module)
+        return result
+
+    def popitem(self) -> tuple:
+        item = super().popitem()
+        if self.__refs is not None:
+            self.__leave(*item)
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self.__refs = self.__uses = self.__inner = None
+
+    def __buildReferences(self) -> None:
+        if self.__refs is None:
+            self.__refs, self.__uses, self.__inner = {}, {}, {}
+            for key, module in self.items():
+                self.__join(key, module)
+
+    def __join(self, key: str, module: Module) -> None:
+        # 模块加入集合：记录它引用的名称，引用它的模块多了一个已知的 master
+        refs: Dict[str, int] = {}
+        for inst in module.instances:
+            if not isinstance(inst.reference, obj.Unknown):
+                name = inst.reference.name
+                refs[name] = refs.get(name, 0) + 1
+        self.__refs[module] = refs
+        self.__inner[module] = sum(1 for name in refs if name in self)
+        for name, count in refs.items():
+            self.__uses.setdefault(name, {})[module] = count
+        for user in self.__uses.get(key, ()):
+            if user is not module:
+                self.__inner[user] += 1
+
+    def __leave(self, key: str, module: Module) -> None:
+        refs = self.__refs.pop(module, None)
+        if refs is None:
+            return
+        del self.__inner[module]
+        for name in refs:
+            users = self.__uses[name]
+            del users[module]
+            if not users:
+                del self.__uses[name]
+        for user in self.__uses.get(key, ()):
+            self.__inner[user] -= 1
+
+    def _countReference(self, module: Module, name: str, delta: int) -> None:
+        """Update the reference graph when an instance of the module changes."""
+        if self.__refs is None:
+            return
+        refs = self.__refs.get(module)
+        if refs is None:
+            return  # 模块已不在集合中
+        count = refs.get(name, 0) + delta
+        users = self.__uses.setdefault(name, {})
+        if count > 0:
+            refs[name] = users[module] = count
+        else:
+            refs.pop(name, None)
+            users.pop(module, None)
+            if not users:
+                del self.__uses[name]
+        if name in self and (count > 0) != (count - delta > 0):
+            self.__inner[module] += 1 if count > 0 else -1
+
     def __iter__(self) -> Iterator[Module]:
-        return iter(self.figs)
+        return iter(self.values())
 
     def __getitem__(self, key: Union[int, str]) -> Module:
         return super().__getitem__(key)
@@ -292,9 +541,137 @@ class ModuleCollection(FigCollection):
             logger.info(f"Rebuilding module {fig.name!r} ...")
             fig.rebuild(mute=mute, verilog_style=verilog_style)
 
+    def countFlat(self) -> Dict[str, Dict[str, Any]]:
+        """The flat counts of all modules, see `Module.getFlatCounts`."""
+        return countFlat(self)
+
     def getTopLevels(self) -> Tuple[obj.Module, ...]:
-        count = defaultdict(int)
-        for module in self:
-            for inst in module.instances:
-                count[inst.reference.name] += 1
-        return tuple(module for module in self if count[module.name] == 0)
+        """The modules not referenced by any instance.
+
+        Like the other reference queries, the reference graph is built on first
+        use and then kept up to date as instances and modules change.
+        """
+        self.__buildReferences()
+        return tuple(module for module in self if module.name not in self.__uses)
+
+    def getLeaves(self) -> Tuple[obj.Module, ...]:
+        """The modules without any instance of a module in the collection."""
+        self.__buildReferences()
+        return tuple(module for module in self if self.__inner[module] == 0)
+
+    def getUnused(self) -> Tuple[obj.Module, ...]:
+        """The modules neither referenced nor referencing another module."""
+        self.__buildReferences()
+        return tuple(
+            module
+            for module in self
+            if module.name not in self.__uses and self.__inner[module] == 0
+        )
+
+    def getMissingMasters(self) -> Dict[str, Tuple[obj.Module, ...]]:
+        """The referenced names without a module, with the modules referencing them.
+
+        Primitive devices and black boxes are missing masters too.
+        """
+        self.__buildReferences()
+        return {
+            name: tuple(users)
+            for name, users in self.__uses.items()
+            if name not in self
+        }
+
+    def getReferrers(self, name: str) -> Dict[obj.Module, int]:
+        """The modules referencing the name, with their numbers of instances."""
+        self.__buildReferences()
+        return dict(self.__uses.get(name, {}))
+
+
+class FlatCounts(dict):
+    """Flat counts of the modules of a design, keyed by module name."""
+
+    __slots__ = ("stamp",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stamp = None
+
+    def __reduce__(self) -> tuple:
+        return (FlatCounts, ())  # 缓存不随对象保存
+
+    def refresh(self, design: obj.Design) -> FlatCounts:
+        # 设计中的模块或实例改变时版本递增
+        if self.stamp != design._version:
+            self.clear()
+            self.update(countFlat(design.modules))
+            self.stamp = design._version
+        return self
+
+
+def countFlat(modules: Iterable[Module]) -> Dict[str, Dict[str, Any]]:
+    """Count the flat instances under the modules bottom-up, every module once."""
+    local: Dict[Module, tuple] = {}
+    done: Dict[Module, Dict[str, Any]] = {}
+    for root in modules:
+        if root in done:
+            continue
+        # 显式栈的后序遍历，子模块统计完成后再合并到上一级
+        # 每层保存子模块的迭代器，已统计或在路径上的子模块不会再变为待统计
+        if root not in local:
+            local[root] = _countLocal(root)
+        stack = [(root, iter(local[root][1].values()))]
+        active = {root}
+        while stack:
+            module, masters_iter = stack[-1]
+            pending = next(
+                (m for m in masters_iter if m not in done and m not in active),
+                None,
+            )
+            if pending is not None:
+                if pending not in local:
+                    local[pending] = _countLocal(pending)
+                stack.append((pending, iter(local[pending][1].values())))
+                active.add(pending)
+                continue
+            stack.pop()
+            active.discard(module)
+            refs, masters, leaves, devices = local[module]
+            references = dict(refs)
+            devices = dict(devices)
+            for ref, master in masters.items():
+                if master not in done:
+                    continue  # 递归例化，不再展开
+                n = refs[ref]
+                sub = done[master]
+                leaves += n * sub["instances"]
+                for k, v in sub["references"].items():
+                    references[k] = references.get(k, 0) + n * v
+                for k, v in sub["devices"].items():
+                    devices[k] = devices.get(k, 0) + n * v
+            done[module] = {
+                "instances": leaves,
+                "references": references,
+                "devices": devices,
+            }
+    return {module.name: counts for module, counts in done.items()}
+
+
+def _countLocal(module: Module) -> tuple:
+    refs: Dict[str, int] = {}
+    masters: Dict[str, Module] = {}
+    leaves = 0
+    devices: Dict[str, int] = {}
+    for inst in module.instances:
+        reference = inst.reference
+        if not isinstance(reference, obj.Unknown):
+            refs[reference.name] = refs.get(reference.name, 0) + 1
+        if reference.name in masters:
+            continue
+        master = reference.getMaster()
+        if master is not None:
+            masters[reference.name] = master
+            continue
+        leaves += 1
+        prefix = (inst.prefix or "")[:1].upper()
+        if prefix and prefix in _DEVICE_PREFIXES:
+            devices[prefix] = devices.get(prefix, 0) + 1
+    return refs, masters, leaves, devices
@@ -5,7 +5,11 @@ from icutk.log import getLogger
 
 from . import obj
 from .fig import Fig, FigCollection
-from .trace import traceByNet, Route
+from .trace import (
+    Route,
+    iterTrace,
+    traceByNet,
+)
 from ..utils import bitInfoSplit
 
 __all__ = [
@@ -15,20 +19,15 @@ __all__ = [
 
 
 class Net(Fig):
+    __slots__ = ()
+
     def getAssocInstances(self) -> Tuple[obj.Instance, ...]:
         """Get the instances associated with the net in the module."""
         module = self.getModule()
         if module is None:
             raise ValueError("Instance not in module")
-        insts = set()
-        for inst in module.instances:
-            if isinstance(inst.connection, list):
-                nets = inst.connection
-            elif isinstance(inst.connection, dict):
-                nets = inst.connection.values()
-            if self.name in nets:
-                insts.add(inst)
-        return tuple(insts)
+        connects = module.instances.getNetConnects(self.name)
+        return tuple(dict.fromkeys(inst for inst, _ in connects))
 
     def split(self) -> Tuple[str, Optional[int]]:
         return bitInfoSplit(self.name)
@@ -36,14 +35,25 @@ class Net(Fig):
     def trace(self, depth: int = -1) -> Route:
         return traceByNet(self, depth=depth)
 
+    def iterTrace(
+        self,
+        depth: int = -1,
+        *,
+        fanout: int = -1,
+        unique: bool = False,
+    ) -> Iterator[Tuple[obj.InstanceHierPath, Union[str, int], Net]]:
+        return iterTrace(self, depth, fanout=fanout, unique=unique)
+
 
 class NetCollection(FigCollection):
+    __slots__ = ()
+
     def _valueChecker(self, fig: Net) -> None:
         if not isinstance(fig, Net):
             raise TypeError("fig must be an Net object")
 
     def __iter__(self) -> Iterator[Net]:
-        return iter(self.figs)
+        return iter(self.values())
 
     def __getitem__(self, key: Union[int, str]) -> Net:
         return super().__getitem__(key)
@@ -5,3 +5,4 @@ from .reference import *  # noqa: F403
 from .net import *  # noqa: F403
 from .terminal import *  # noqa: F403
 from .design import *  # noqa: F403
+from .flatten import *  # noqa: F403
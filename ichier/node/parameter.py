@@ -10,6 +10,8 @@ __all__ = [
 
 
 class ParameterCollection(Collection):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         strings = ["Params:"]
         for key, value in self.items():
@@ -27,10 +29,12 @@ class ParameterCollection(Collection):
 
 
 class SpecifyParameters(ParameterCollection):
-    pass
+    __slots__ = ()
 
 
 class OrderParameters(OrderList):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return self.repr("Params")
 
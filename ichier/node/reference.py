@@ -1,3 +1,4 @@
+from __future__ import annotations
 from typing import Optional
 from . import obj
 
@@ -15,7 +16,6 @@ class Reference(str):
     def __init__(self, name: str, instance: Optional[obj.Instance] = None) -> None:
         if instance is not None and not isinstance(instance, obj.Instance):
             raise TypeError("instance must be an Instance")
-        self.__name = str(self)
         self.__instance = instance
 
     def __repr__(self) -> str:
@@ -30,19 +30,32 @@ class Reference(str):
 
     @property
     def name(self) -> str:
-        return self.__name
+        return super().__str__()
 
     @property
     def instance(self) -> Optional[obj.Instance]:
         return self.__instance
 
     def getMaster(self) -> Optional[obj.Module]:
-        if self.instance is None:
-            return
-        design = self.instance.getDesign()
-        if design is None:
-            return
-        return design.modules.get(self.name)
+        """The module named by the reference in the design of the instance.
+
+        The module collection of the design is its binding table from names to
+        modules, it is kept up to date by adding, removing and renaming modules.
+        The collections are followed directly up to it, with one dict lookup.
+        """
+        instance = self.__instance
+        if instance is None:
+            return None
+        collection = instance.collection
+        if collection is None:
+            return None
+        module = collection.parent
+        if module is None:
+            return None
+        modules = module.collection
+        if not isinstance(modules, obj.ModuleCollection):
+            return None
+        return dict.get(modules, self.name)
 
 
 class DesignateReference(Reference):
@@ -51,6 +64,8 @@ class DesignateReference(Reference):
 
 
 class Unknown:
+    __slots__ = ("__instance",)
+
     def __init__(self, instance: Optional[obj.Instance] = None) -> None:
         if instance is not None and not isinstance(instance, obj.Instance):
             raise TypeError("instance must be an Instance")
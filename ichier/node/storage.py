@@ -0,0 +1,341 @@
+from __future__ import annotations
+from array import array
+from functools import partial
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List, Union
+import mmap
+import struct
+import sys
+
+from . import obj
+from ..utils.escape import EscapeString
+
+__all__ = []
+
+# 文件结构，整数均为小端序：
+#   头部       magic, 版本, 字符串数, 字符串数据的字节数
+#   字符串表   每个字符串的类型 (1 字节)，起始偏移 (u32，数据超过 4 GiB 时为 u64)，
+#              UTF-8 数据
+#   设计记录   u32 个数，随后是 u32 整数
+#   模块偏移   每个模块的记录在模块数据中的起始偏移 (u64)，最后一项为总长度
+#   模块数据   每个模块一段 u32 整数，加载时按需解码
+#
+# 名称和参数值都记为字符串表中的编号，编号 0 为 None，其余为下标加 1。
+# 多个线网的连接记为 _GROUP | 个数，随后是各个线网。
+_MAGIC = b"ICHIERDB"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIQ")
+_GROUP = 1 << 31
+
+_DIRECTIONS = ("input", "output", "inout")
+_DIRECTION_CODES = {d: i for i, d in enumerate(_DIRECTIONS)}
+
+# 字符串表中的值类型
+_STR, _ESCAPE, _INT, _FLOAT, _BOOL = range(5)
+_DECODERS = {
+    _ESCAPE: lambda s: EscapeString("\\" + s),
+    _INT: int,
+    _FLOAT: float,
+    _BOOL: lambda s: s == "1",
+}
+
+# 实例的引用类型
+_UNKNOWN, _REFERENCE, _DESIGNATE = range(3)
+
+
+def _pack(ints: array) -> bytes:
+    if sys.byteorder == "big":
+        ints = array(ints.typecode, ints)
+        ints.byteswap()
+    return ints.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    ints = array(typecode, data)
+    if sys.byteorder == "big":
+        ints.byteswap()
+    return ints
+
+
+class _Encoder:
+    """Collect the string table and encode the records as integers."""
+
+    def __init__(self) -> None:
+        self.plain: Dict[str, int] = {}  # 绝大多数值是普通字符串
+        self.typed: Dict[tuple, int] = {}
+        self.kinds = bytearray()
+        self.texts: List[str] = []
+
+    def value(self, value: Any) -> int:
+        if value is None:
+            return 0
+        if type(value) is str:
+            index = self.plain.get(value)
+            if index is None:
+                index = self.plain[value] = self.__add(_STR, value)
+            return index
+        if isinstance(value, EscapeString):
+            kind, text = _ESCAPE, str.__str__(value)
+        elif isinstance(value, str):
+            return self.value(str.__str__(value))  # Reference 等子类按名称保存
+        elif isinstance(value, bool):
+            kind, text = _BOOL, "1" if value else "0"
+        elif isinstance(value, int):
+            kind, text = _INT, str(int(value))
+        elif isinstance(value, float):
+            kind, text = _FLOAT, repr(float(value))
+        else:
+            raise TypeError(f"value can not be saved - {value!r}")
+        index = self.typed.get((kind, text))
+        if index is None:
+            index = self.typed[(kind, text)] = self.__add(kind, text)
+        return index
+
+    def __add(self, kind: int, text: str) -> int:
+        if len(self.texts) >= _GROUP - 1:
+            raise OverflowError("too many distinct names and values to save")
+        self.kinds.append(kind)
+        self.texts.append(text)
+        return len(self.texts)
+
+    def pairs(self, ints: array, items: Dict[str, Any]) -> None:
+        value = self.value
+        ints.append(len(items))
+        for k, v in items.items():
+            ints.append(value(k))
+            ints.append(value(v))
+
+    def net(self, ints: array, net: Any) -> None:
+        if net is None or isinstance(net, str):
+            ints.append(self.value(net))
+        else:
+            ints.append(_GROUP | len(net))
+            ints.extend(self.value(n) for n in net)
+
+    def module(self, module: obj.Module) -> array:
+        value = self.value
+        ints = array("I")
+        ints.append(len(module.terminals))
+        for term in module.terminals:
+            ints.append(value(term.name))
+            ints.append(_DIRECTION_CODES[term.direction])
+        ints.append(len(module.nets))
+        ints.extend(value(name) for name in module.nets.keys())
+        self.pairs(ints, module.parameters)
+        self.pairs(ints, module.specparams)
+        ints.append(len(module.instances))
+        for inst in module.instances:
+            self.instance(ints, inst)
+        return ints
+
+    def instance(self, ints: array, inst: obj.Instance) -> None:
+        value = self.value
+        reference = inst.reference
+        if isinstance(reference, obj.Unknown):
+            kind, name = _UNKNOWN, None
+        elif isinstance(reference, obj.DesignateReference):
+            kind, name = _DESIGNATE, reference.name
+        else:
+            kind, name = _REFERENCE, reference.name
+        prefix, parameters, orderparams = inst._saveState()
+        error = None if inst.error is None else str(inst.error)
+        ints.extend(
+            (
+                value(inst.name),
+                kind,
+                value(name),
+                value(prefix),
+                value(inst.raw),
+                value(error),
+            )
+        )
+        connection = inst.connection
+        if isinstance(connection, dict):
+            ints.append(0)
+            ints.append(len(connection))
+            for term, net in connection.items():
+                ints.append(value(term))
+                self.net(ints, net)
+        else:
+            ints.append(1)
+            ints.append(len(connection))
+            for net in connection:
+                self.net(ints, net)
+        self.pairs(ints, parameters)
+        ints.append(len(orderparams))
+        ints.extend(value(v) for v in orderparams)
+
+    def strings(self) -> List[bytes]:
+        data = [text.encode("utf-8") for text in self.texts]
+        size = sum(map(len, data))
+        offsets = array("I" if size < 1 << 32 else "Q", [0])
+        offsets.extend(accumulate(map(len, data)))
+        header = _HEADER.pack(_MAGIC, _VERSION, len(data), size)
+        return [header, bytes(self.kinds), _pack(offsets), *data]
+
+
+def saveDesign(design: obj.Design, path: Union[str, Path]) -> None:
+    encoder = _Encoder()
+    value = encoder.value
+    blocks = [encoder.module(module) for module in design.modules]
+
+    record = array("I")
+    record.append(value(design.name))
+    record.append(value(None if design.path is None else str(design.path)))
+    encoder.pairs(record, design.parameters)
+    record.append(len(design.priority))
+    record.extend(value(p) for p in design.priority)
+    record.append(len(design.modules))
+    for module in design.modules:
+        record.append(value(module.name))
+        record.append(value(module.prefix))
+        record.append(value(None if module.path is None else str(module.path)))
+        record.append(value(module.lineno))
+
+    offsets = array("Q", [0])
+    offsets.extend(accumulate(len(block) * 4 for block in blocks))
+    with open(path, "wb") as f:
+        f.writelines(encoder.strings())
+        f.write(_pack(array("I", [len(record)])))
+        f.write(_pack(record))
+        f.write(_pack(offsets))
+        for block in blocks:
+            f.write(_pack(block))
+
+
+class _Values(dict):
+    """The decoded values of the string table, decoded on first use."""
+
+    __slots__ = ("data", "kinds", "offsets", "start")
+
+    def __missing__(self, index: int) -> Any:
+        i = index - 1
+        start = self.start
+        text = self.data[start + self.offsets[i] : start + self.offsets[i + 1]]
+        value = text.decode("utf-8")
+        kind = self.kinds[i]
+        if kind != _STR:
+            value = _DECODERS[kind](value)
+        self[index] = value
+        return value
+
+
+class _Reader:
+    """The modules of a design file, decoded one by one from the mapped file."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        with open(path, "rb") as f:
+            size = f.seek(0, 2)
+            if size < _HEADER.size:
+                raise ValueError(f"not a design file - {str(path)!r}")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, length = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            data.close()
+            raise ValueError(f"not a design file - {str(path)!r}")
+        if version != _VERSION:
+            data.close()
+            raise ValueError(f"unsupported design file version {version}")
+
+        pos = _HEADER.size
+        kinds = data[pos : pos + count]
+        pos += count
+        typecode = "I" if length < 1 << 32 else "Q"
+        width = array(typecode).itemsize
+        offsets = _unpack(typecode, data[pos : pos + (count + 1) * width])
+        pos += (count + 1) * width
+        values = self.values = _Values({0: None})
+        values.data, values.kinds, values.offsets, values.start = (
+            data,
+            kinds,
+            offsets,
+            pos,
+        )
+        pos += length
+
+        (size,) = _unpack("I", data[pos : pos + 4])
+        pos += 4
+        self.record = iter(_unpack("I", data[pos : pos + size * 4]).tolist())
+        self.data = data
+        self.pos = pos + size * 4
+        self.pending = 0
+
+    def design(self) -> obj.Design:
+        nxt, val = self.record.__next__, self.values.__getitem__
+        name, path = val(nxt()), val(nxt())
+        parameters = {val(nxt()): val(nxt()) for _ in range(nxt())}
+        priority = tuple(val(nxt()) for _ in range(nxt()))
+        design = obj.Design(name, parameters=parameters, priority=priority)
+        design.path = path
+
+        count = nxt()
+        size = (count + 1) * 8
+        self.offsets = _unpack("Q", self.data[self.pos : self.pos + size])
+        self.start = self.pos + size
+        modules = []
+        for i in range(count):
+            module = obj.Module(val(nxt()), prefix=val(nxt()))
+            module.path = val(nxt())
+            module.lineno = val(nxt())
+            module._setSource(partial(self.module, i))
+            modules.append(module)
+        self.pending = count
+        if not count:
+            self.close()
+        design.modules.extend(modules)
+        return design
+
+    def module(self, index: int) -> tuple:
+        start = self.start
+        begin, end = self.offsets[index], self.offsets[index + 1]
+        ints = _unpack("I", self.data[start + begin : start + end]).tolist()
+        nxt, val = iter(ints).__next__, self.values.__getitem__
+        terminals = [obj.Terminal(val(nxt()), _DIRECTIONS[nxt()]) for _ in range(nxt())]
+        nets = [obj.Net(val(nxt())) for _ in range(nxt())]
+        parameters = {val(nxt()): val(nxt()) for _ in range(nxt())}
+        specparams = {val(nxt()): val(nxt()) for _ in range(nxt())}
+        instances = [self.instance(nxt, val) for _ in range(nxt())]
+        self.pending -= 1
+        if not self.pending:
+            self.close()  # 所有模块都已加载，不再需要文件
+        return terminals, nets, instances, parameters, specparams
+
+    @staticmethod
+    def instance(nxt, val) -> obj.Instance:
+        name, kind, reference = val(nxt()), nxt(), val(nxt())
+        prefix, raw, error = val(nxt()), val(nxt()), val(nxt())
+        if kind == _DESIGNATE:
+            reference = obj.DesignateReference(reference)
+
+        def net() -> Any:
+            n = nxt()
+            if n & _GROUP:
+                return tuple(val(nxt()) for _ in range(n & ~_GROUP))
+            return val(n)
+
+        if nxt() == 0:
+            connection = {val(nxt()): net() for _ in range(nxt())}
+        else:
+            connection = [net() for _ in range(nxt())]
+        parameters = {val(nxt()): val(nxt()) for _ in range(nxt())}
+        orderparams = [val(nxt()) for _ in range(nxt())]
+        return obj.Instance(
+            reference,
+            name,
+            connection,
+            parameters,
+            orderparams,
+            prefix,
+            raw,
+            error,
+        )
+
+    def close(self) -> None:
+        self.values.clear()
+        self.values.data = None
+        self.data.close()
+
+
+def loadDesign(path: Union[str, Path]) -> obj.Design:
+    return _Reader(path).design()
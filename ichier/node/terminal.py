@@ -1,9 +1,14 @@
 from __future__ import annotations
 from typing import Any, Dict, Iterator, Optional, Literal, Tuple, Union
 
+from . import obj
 from .fig import Fig, FigCollection
 from .net import bitInfoSplit
-from .trace import traceByNet, Route
+from .trace import (
+    Route,
+    iterTrace,
+    traceByNet,
+)
 
 __all__ = [
     "Terminal",
@@ -12,6 +17,8 @@ __all__ = [
 
 
 class Terminal(Fig):
+    __slots__ = ("__direction",)
+
     def __init__(
         self,
         name: Optional[str] = None,
@@ -42,14 +49,29 @@ class Terminal(Fig):
             raise ValueError("unbound terminal cannot trace")
         return traceByNet(module.nets[self.name], depth=depth)
 
+    def iterTrace(
+        self,
+        depth: int = -1,
+        *,
+        fanout: int = -1,
+        unique: bool = False,
+    ) -> Iterator[Tuple[obj.InstanceHierPath, Union[str, int], obj.Net]]:
+        module = self.getModule()
+        if module is None:
+            raise ValueError("unbound terminal cannot trace")
+        net = module.nets[self.name]
+        return iterTrace(net, depth, fanout=fanout, unique=unique)
+
 
 class TerminalCollection(FigCollection):
+    __slots__ = ()
+
     def _valueChecker(self, fig: Terminal) -> None:
         if not isinstance(fig, Terminal):
             raise TypeError("fig must be an Terminal object")
 
     def __iter__(self) -> Iterator[Terminal]:
-        return iter(self.figs)
+        return iter(self.values())
 
     def __getitem__(self, key: Union[int, str]) -> Terminal:
         return super().__getitem__(key)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
 from . import obj
 
@@ -8,12 +8,30 @@ __all__ = [
     "ConnectByOrder",
     "ConnectType",
     "Route",
+    "iterTrace",
     "traceByNet",
     "traceByInstTermName",
     "traceByInstTermOrder",
 ]
 
 
+class RouteCache(dict):
+    """Routes of the nets of a module, keyed by `(net name, depth)`.
+
+    `stamp` is the design and its version, or the module version if the
+    module is not in a design, when the routes were traced.
+    """
+
+    __slots__ = ("stamp",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stamp = None
+
+    def __reduce__(self) -> tuple:
+        return (RouteCache, ())  # 缓存不随对象保存
+
+
 class Connect:
     instance: obj.Instance
     route: Optional[Route]
@@ -45,7 +63,8 @@ class Connect:
             net = master.nets[self.name]
         elif isinstance(self, ConnectByOrder):
             net = master.nets[master.terminals[self.order].name]
-        route = traceByNet(net, depth - 1)
+        # 负数表示不限深度，统一为 -1 以便共享缓存
+        route = traceByNet(net, depth - 1 if depth > 0 else -1)
         if peek:
             return route
         if route.connect_collection:
@@ -91,22 +110,39 @@ class Route:
 
 
 def traceByNet(net: obj.Net, depth: int = -1) -> Route:
+    """Trace the net down the hierarchy, at most `depth` levels if not negative.
+
+    Routes are memoized per (module, net, remaining depth), so the instances of
+    a master share the same sub routes. The cache is reset on structural edits
+    of the design, the returned routes must be treated as read only.
+    """
     module = net.getModule()
     if module is None:
         return Route(net, [])
+    if depth < 0:
+        depth = -1
+    routes = module._routes
+    design = module.getDesign()
+    if design is None:
+        stamp = (None, module._version)
+    else:
+        stamp = (design, design._version)  # 子模块都在同一个设计中
+    if routes.stamp != stamp:
+        routes.clear()
+        routes.stamp = stamp
+    key = (net.name, depth)
+    route = routes.get(key)
+    if route is not None and route.net is net:
+        return route
     segs = []
-    for inst in module.instances:
-        if isinstance(inst.connection, dict):
-            for t, n in inst.connection.items():
-                if n == net.name:
-                    segs.append(traceByInstTermName(inst, t, depth))
-        elif isinstance(inst.connection, list):
-            for i, n in enumerate(inst.connection):
-                if n == net.name:
-                    segs.append(traceByInstTermOrder(inst, i, depth))
+    for inst, term in module.instances.getNetConnects(net.name):
+        if isinstance(term, str):
+            segs.append(traceByInstTermName(inst, term, depth))
         else:
-            raise TypeError(f"Invalid connection type {type(inst.connection)}")
-    return Route(net, segs)
+            segs.append(traceByInstTermOrder(inst, term, depth))
+    route = Route(net, segs)
+    routes[key] = route
+    return route
 
 
 def traceByInstTermName(
@@ -139,3 +175,72 @@ def traceByInstTermOrder(
     connect = ConnectByOrder(instance, term_order)
     connect.trace(depth)
     return connect
+
+
+def iterTrace(
+    net: obj.Net,
+    depth: int = -1,
+    *,
+    fanout: int = -1,
+    unique: bool = False,
+) -> Iterator[Tuple[obj.InstanceHierPath, Union[str, int], obj.Net]]:
+    """Trace the net down the hierarchy lazily, without building a `Route`.
+
+    Yields `(path, terminal, net)` for every instance terminal reached, where
+    `path` ends with the instance, `terminal` is the term name or order of its
+    connection and `net` is the net connected to it, in the same order as
+    `traceByNet`. Masters are entered at most `depth` levels deep if not
+    negative, and at most `fanout` connections of each net are followed if not
+    negative. A master is never entered again inside itself, with `unique`
+    every net of a master is entered only once.
+    """
+    visited = set()
+    module = net.getModule()
+    active = {module}  # 当前路径上的模块，用于忽略递归例化
+    # 显式栈代替递归，每层保存路径、所在模块、线网、剩余深度和剩余的连接
+    stack = [((), module, net, depth, _iterConnects(net, fanout))]
+    while stack:
+        path, module, net, depth, connects = stack[-1]
+        try:
+            inst, term = next(connects)
+        except StopIteration:
+            stack.pop()
+            active.discard(module)
+            continue
+        hier = path + (inst,)
+        yield obj.InstanceHierPath(hier), term, net
+        if depth == 0:
+            continue
+        master = inst.reference.getMaster()
+        if master is None or master in active:
+            continue
+        sub = _masterNet(master, term)
+        if sub is None:
+            continue
+        if unique:
+            if sub in visited:
+                continue
+            visited.add(sub)
+        active.add(master)
+        sub_depth = depth - 1 if depth > 0 else -1
+        stack.append((hier, master, sub, sub_depth, _iterConnects(sub, fanout)))
+
+
+def _iterConnects(
+    net: obj.Net, fanout: int
+) -> Iterator[Tuple[obj.Instance, Union[str, int]]]:
+    module = net.getModule()
+    if module is None:
+        return iter(())
+    connects = module.instances.getNetConnects(net.name)
+    if fanout >= 0:
+        connects = connects[:fanout]
+    return iter(connects)
+
+
+def _masterNet(master: obj.Module, term: Union[str, int]) -> Optional[obj.Net]:
+    if isinstance(term, int):
+        if term >= len(master.terminals):
+            return None
+        term = master.terminals[term].name
+    return master.nets.get(term)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import re
+
+from . import obj
+from ..utils import bitInfoSplit
+from ..utils.escape import EscapeString
+
+__all__ = []
+
+# (名称, 括号, 位)：标量的括号为 None，位为空
+BitGroup = Tuple[str, Optional[str], Tuple[int, ...]]
+
+_IDENTIFIER = re.compile(r"[a-zA-Z_][\w$]*")
+
+# 不能直接作为标识符的 Verilog 关键字
+_KEYWORDS = frozenset("""
+    always and assign begin buf bufif0 bufif1 case casex casez cmos deassign
+    default defparam disable edge else end endcase endfunction endmodule
+    endprimitive endspecify endtable endtask event for force forever fork
+    function highz0 highz1 if ifnone initial inout input integer join large
+    macromodule medium module nand negedge nmos nor not notif0 notif1 or
+    output parameter pmos posedge primitive pull0 pull1 pulldown pullup rcmos
+    real realtime reg release repeat rnmos rpmos rtran rtranif0 rtranif1
+    scalared small specify specparam strong0 strong1 supply0 supply1 table
+    task time tran tranif0 tranif1 tri tri0 tri1 triand trior trireg vectored
+    wait wand weak0 weak1 while wire wor xnor xor
+    """.split())
+
+
+def verilogId(name: str) -> str:
+    """The Verilog identifier of the name, escaped if it is not a simple one."""
+    if isinstance(name, EscapeString) or name in _KEYWORDS:
+        pass
+    elif name.isascii() and name.isidentifier() or _IDENTIFIER.fullmatch(name):
+        return name
+    return f"\\{name} "  # 转义标识符以空白结束
+
+
+def verilogValue(value: Any) -> str:
+    """The Verilog constant of a parameter value, a string if not a number."""
+    if isinstance(value, (int, float)):
+        return str(value)
+    s = str(value)
+    if re.fullmatch(r"\d+(\.\d+)?([eE][-+]?\d+)?", s):
+        return s
+    return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def memberName(head: str, brackets: str, bit: int) -> str:
+    return f"{head}{brackets[0]}{bit}{brackets[1]}"
+
+
+def groupBits(
+    names: Iterable[str],
+    reserved: Iterable[str] = (),
+    ordered: bool = True,
+) -> List[BitGroup]:
+    """Group the members `name[bit]` or `name<bit>` of the names into buses.
+
+    A bus takes the place of its first member and keeps the member order, or
+    has the bits in descending order if not `ordered`. The members stay scalar
+    names if their bits are not a contiguous range, if both brackets are used,
+    or if the bus name is also a scalar or `reserved` name.
+    """
+    scalars: Set[str] = set(reserved)
+    buses: Dict[str, list] = {}
+    order: List[Tuple[str, Optional[list]]] = []
+    for name in names:
+        if name[-1:] not in "]>":
+            bit = None  # 大多数名称不是总线成员
+        else:
+            head, bit = bitInfoSplit(name)
+        if bit is None:
+            scalars.add(name)
+            order.append((name, None))
+            continue
+        entry = buses.get(head)
+        brackets = "[]" if name[len(head)] == "[" else "<>"
+        if entry is None:
+            entry = buses[head] = [brackets, []]
+            order.append((head, entry))
+        elif entry[0] != brackets:
+            entry[0] = None  # 混用两种括号，不作为总线
+        entry[1].append((bit, name))
+
+    groups: List[BitGroup] = []
+    for key, entry in order:
+        if entry is None:
+            groups.append((key, None, ()))
+            continue
+        brackets, members = entry
+        bits = tuple(bit for bit, _ in members)
+        if not ordered:
+            bits = tuple(sorted(bits, reverse=True))
+        if brackets is not None and key not in scalars and _isRange(bits):
+            groups.append((key, brackets, bits))
+        else:
+            groups.extend((name, None, ()) for _, name in members)
+    return groups
+
+
+def _isRange(bits: Tuple[int, ...]) -> bool:
+    step = -1 if len(bits) > 1 and bits[1] < bits[0] else 1
+    return bits == tuple(range(bits[0], bits[0] + step * len(bits), step))
+
+
+def rangeText(bits: Tuple[int, ...]) -> str:
+    return f"[{bits[0]}:{bits[-1]}]"
+
+
+def portGroups(module: obj.Module, cache: Dict[obj.Module, tuple]) -> List[BitGroup]:
+    """The ports of the module, the bus members with one direction grouped."""
+    return _ports(module, cache)[0]
+
+
+def portMembers(module: obj.Module, cache: Dict[obj.Module, tuple]) -> Set[str]:
+    """The names of the ports of the module and of their bus members."""
+    return _ports(module, cache)[1]
+
+
+def portIds(module: obj.Module, cache: Dict[obj.Module, tuple]) -> List[str]:
+    """The Verilog identifiers of `portGroups`."""
+    return _ports(module, cache)[2]
+
+
+def _ports(module: obj.Module, cache: Dict[obj.Module, tuple]) -> tuple:
+    # 每个模块只分组一次，写整个设计时共用
+    ports = cache.get(module)
+    if ports is None:
+        terminals = module.terminals
+        # 与端口总线同名的线网使总线成员保持为标量
+        heads = set()
+        for name in terminals.keys():
+            head, bit = bitInfoSplit(name)
+            if bit is not None:
+                heads.add(head)
+        reserved = {n for n in connectedNets(module) if n in heads} if heads else ()
+        groups = []
+        for group in groupBits((t.name for t in terminals), reserved):
+            head, brackets, bits = group
+            if brackets is not None:
+                members = [memberName(head, brackets, bit) for bit in bits]
+                if len({terminals[m].direction for m in members}) > 1:
+                    groups.extend((m, None, ()) for m in members)
+                    continue
+            groups.append(group)
+        members = set(terminals.keys())
+        members.update(head for head, _, _ in groups)
+        ids = [verilogId(head) for head, _, _ in groups]
+        ports = cache[module] = (groups, members, ids)
+    return ports
+
+
+def groupNames(groups: Iterable[BitGroup], names: Dict[str, str]) -> None:
+    """Map the names of the groups to their Verilog expressions."""
+    for head, brackets, bits in groups:
+        if brackets is None:
+            names[head] = verilogId(head)
+        else:
+            bus = verilogId(head)
+            for bit in bits:
+                names[memberName(head, brackets, bit)] = f"{bus}[{bit}]"
+
+
+def moduleNames(module: obj.Module, cache: Dict[obj.Module, tuple]) -> Dict[str, str]:
+    """Map the ports and nets of the module to their Verilog expressions."""
+    names: Dict[str, str] = {}
+    ports = portGroups(module, cache)
+    groupNames(ports, names)
+    groupNames(wireGroups(module, ports), names)
+    return names
+
+
+def wireGroups(module: obj.Module, ports: List[BitGroup]) -> List[BitGroup]:
+    """The nets of the module which are not ports, the bus members grouped."""
+    terminals = module.terminals
+    nets = (n for n in dict.fromkeys(connectedNets(module)) if n not in terminals)
+    return groupBits(nets, [head for head, _, _ in ports], ordered=False)
+
+
+def connectedNets(module: obj.Module) -> Iterator[str]:
+    """The nets of the module and the nets connected to its instances."""
+    yield from module.nets.keys()
+    for inst in module.instances:
+        yield from instanceNets(inst)
+
+
+def instanceNets(inst: obj.Instance) -> Iterator[str]:
+    connection = inst.connection
+    values = connection.values() if isinstance(connection, dict) else connection
+    for net in values:
+        if isinstance(net, str):
+            yield net
+        elif isinstance(net, (list, tuple)):
+            yield from (n for n in net if isinstance(n, str))
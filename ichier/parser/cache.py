@@ -0,0 +1,111 @@
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+import hashlib
+import os
+import pickle
+
+from ..node import Design
+from .. import release
+
+__all__ = [
+    "ParseCache",
+]
+
+
+class ParseCache:
+    """Parsed designs of the included files, pickled in `directory`.
+
+    Every entry belongs to one file of one parser, it records the ichier
+    version, the path, the size, the mtime and the content hash of the file.
+    An entry is reused when the version matches and the content is unchanged,
+    an unchanged size and mtime skips hashing files that are not read yet.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory).expanduser()
+
+    def load(self, item: Any) -> Optional[Design]:
+        """The cached design of the item, None if missing or stale."""
+        path = self._entry(item)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                header = pickle.load(f)
+                if not self._check(item, header):
+                    return None
+                design = pickle.load(f)
+        except Exception:
+            return None  # 缓存文件损坏，重新解析
+        if not isinstance(design, Design):
+            return None
+        design.priority = item.priority
+        return design
+
+    def dump(self, item: Any, design: Design) -> None:
+        """Store the design parsed from the item, errors are ignored."""
+        path = self._entry(item)
+        size, mtime = self._stat(item)
+        header = {
+            "version": release.version,
+            "path": self._path(item),
+            "size": size,
+            "mtime": mtime,
+            "digest": self._digest(item),
+        }
+        # 先写入临时文件再替换，避免多个进程同时读写同一个文件
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(design, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+
+    def _check(self, item: Any, header: dict) -> bool:
+        if header.get("version") != release.version:
+            return False
+        if header.get("path") != self._path(item):
+            return False
+        if not item.code:
+            # 文件尚未读取，大小和修改时间不变时不再计算哈希
+            size, mtime = self._stat(item)
+            if mtime is not None and (size, mtime) == (
+                header.get("size"),
+                header.get("mtime"),
+            ):
+                return True
+        return header.get("digest") == self._digest(item)
+
+    def _entry(self, item: Any) -> Path:
+        path = self._path(item)
+        if path is None:
+            key = f"{type(item).__module__}:{self._digest(item)}"
+        else:
+            key = f"{type(item).__module__}:{path}"
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.pickle"
+
+    @staticmethod
+    def _path(item: Any) -> Optional[str]:
+        if item.path is None or not Path(item.path).is_file():
+            return None
+        return str(Path(item.path).resolve())
+
+    @staticmethod
+    def _stat(item: Any) -> Tuple[Optional[int], Optional[int]]:
+        if item.path is None:
+            return None, None
+        try:
+            stat = Path(item.path).stat()
+        except OSError:
+            return None, None
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def _digest(item: Any) -> str:
+        code = item.code
+        if not code and item.path is not None and Path(item.path).is_file():
+            code = Path(item.path).read_text(encoding="utf-8")
+        return hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest()
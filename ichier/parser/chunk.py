@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Union
+import os
+
+from ..node import Design
+from .cache import ParseCache
+
+__all__ = [
+    "MIN_CHUNK_SIZE",
+    "autoChunkSize",
+    "joinChunks",
+    "mergeDesigns",
+    "loadItems",
+]
+
+MIN_CHUNK_SIZE = 1 << 20  # 小于该字符数的文件不做拆分
+
+
+def autoChunkSize(length: int) -> int:
+    """About one chunk per CPU, but not smaller than `MIN_CHUNK_SIZE`."""
+    return max(MIN_CHUNK_SIZE, -(-length // (os.cpu_count() or 1)))
+
+
+def joinChunks(designs: Iterable[Design]) -> List[Design]:
+    """Join the worker results of the chunks into one design per file.
+
+    Consecutive designs with the same priority are chunks of one file, the first
+    definition in the file wins like an unsplit parse.
+    """
+    joined: List[Design] = []
+    for d in designs:
+        if joined and joined[-1].priority == d.priority:
+            last = joined[-1]
+            for m in d.modules:
+                if last.modules.get(m.name) is None:
+                    last.modules.append(m)  # 忽略重复的定义
+        else:
+            joined.append(d)
+    return joined
+
+
+def mergeDesigns(designs: Iterable[Design]) -> Design:
+    """Merge the worker results in the order of the items.
+
+    The chunks are joined by `joinChunks` first, then the files are included by
+    `Design.includeOtherDesign`.
+    """
+    design = Design()
+    for d in joinChunks(designs):
+        design.includeOtherDesign(d)
+    return design
+
+
+def loadItems(
+    items: Sequence[Any],
+    run: Callable[[List[Any]], List[Design]],
+    *,
+    chunk_size: Optional[int] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> Design:
+    """Parse the items returned by `parseInclude` and merge the results.
+
+    `run` parses a list of split items in the workers. With `cache_dir`, files
+    unchanged since the last parse are loaded from the `ParseCache` and only
+    the others are split and parsed.
+    """
+    cache = None if cache_dir is None else ParseCache(cache_dir)
+    cached = [None if cache is None else cache.load(item) for item in items]
+    todo = [item for item, d in zip(items, cached) if d is None]
+    chunks = []
+    for item in todo:
+        chunks.extend(item.split(chunk_size))
+    parsed = iter(joinChunks(run(chunks)) if chunks else [])
+    designs = []
+    for item, d in zip(items, cached):
+        if d is None:
+            d = next(parsed)
+            if cache is not None:
+                cache.dump(item, d)
+        designs.append(d)
+    design = Design()
+    for d in designs:
+        design.includeOtherDesign(d)
+    return design
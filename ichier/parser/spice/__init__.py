@@ -3,12 +3,13 @@ from dataclasses import dataclass, field
 from multiprocessing import Pool
 from pathlib import Path
 from queue import Queue
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 import re
 import os
 
 from .string import LineIterator
 from .parser import parse, SpiceIncludeError
+from ..chunk import MIN_CHUNK_SIZE, autoChunkSize, loadItems
 import ichier
 
 
@@ -17,6 +18,8 @@ def fromFile(
     *,
     rebuild: bool = False,
     msg_queue: Optional[Queue] = None,
+    chunk_size: Optional[int] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> ichier.Design:
     path = Path(file)
     return fromCode(
@@ -24,6 +27,8 @@ def fromFile(
         rebuild=rebuild,
         path=path,
         msg_queue=msg_queue,
+        chunk_size=chunk_size,
+        cache_dir=cache_dir,
     )
 
 
@@ -33,14 +38,21 @@ def fromCode(
     rebuild: bool = False,
     path: Optional[Path] = None,
     msg_queue: Optional[Queue] = None,
+    chunk_size: Optional[int] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> ichier.Design:
-    args_array = [(item, msg_queue) for item in parseInclude(file=str(path), code=code)]
-    # designs = [worker(*args) for args in args_array]
-    with Pool() as pool:
-        designs = pool.starmap(worker, args_array)
-    design = ichier.Design()
-    for d in designs:
-        design.includeOtherDesign(d)
+    def run(items: list) -> list:
+        args_array = [(item, msg_queue) for item in items]
+        # return [worker(*args) for args in args_array]
+        with Pool() as pool:
+            return pool.starmap(worker, args_array)
+
+    design = loadItems(
+        parseInclude(file=str(path), code=code),
+        run,
+        chunk_size=chunk_size,
+        cache_dir=cache_dir,
+    )
     if rebuild:
         design.modules.rebuild()
     if path is not None:
@@ -66,6 +78,42 @@ def worker(
     return design
 
 
+# splitlines() 除了 \n 以外的换行符，存在时无法按 \n 计算行号
+_OTHER_LINE_BREAKS = re.compile(r"\r(?!\n)|[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def splitSubckts(code: str, chunk_size: int) -> List[Tuple[int, str]]:
+    """Split the code into chunks of about `chunk_size` characters.
+
+    The chunks are only cut in front of a top-level `.SUBCKT` line, so every
+    subckt is kept in one chunk. Returns `(lineno_offset, code)` pairs, the
+    offset is the number of lines before the chunk.
+    """
+    if len(code) <= chunk_size or _OTHER_LINE_BREAKS.search(code):
+        return [(0, code)]
+    chunks = []
+    start = 0
+    lineno_offset = 0
+    inside = False
+    found = False  # 当前块中是否已有 subckt
+    for m in re.finditer(r"^\.(SUBCKT|ENDS)", code, re.MULTILINE | re.IGNORECASE):
+        if m.group(1).upper() == "ENDS":
+            inside = False
+        elif inside:
+            continue  # 未结束的 subckt 中的 .SUBCKT 会被忽略
+        elif not found:
+            inside = found = True
+        else:
+            inside = True
+            if m.start() - start >= chunk_size:
+                chunk = code[start : m.start()]
+                chunks.append((lineno_offset, chunk))
+                lineno_offset += chunk.count("\n")
+                start = m.start()
+    chunks.append((lineno_offset, code[start:]))
+    return chunks
+
+
 def removeComments(code: str) -> str:
     lines = []
     for line in code.splitlines(keepends=True):
@@ -129,6 +177,23 @@ class CodeItem:
     priority: tuple
     code: str = field(repr=False)
     path: Optional[Path] = None
+    lineno_offset: int = 0
+
+    def split(self, chunk_size: Optional[int] = None) -> List[CodeItem]:
+        if chunk_size is None:
+            chunk_size = autoChunkSize(len(self.code))
+        chunks = splitSubckts(self.code, chunk_size)
+        if len(chunks) == 1:
+            return [self]
+        return [
+            CodeItem(
+                priority=self.priority,
+                code=code,
+                path=self.path,
+                lineno_offset=self.lineno_offset + offset,
+            )
+            for offset, code in chunks
+        ]
 
     def load(
         self,
@@ -146,6 +211,7 @@ class CodeItem:
         design = parse(
             lineiter=lineiter,
             priority=self.priority,
+            lineno_offset=self.lineno_offset,
         )
         if self.path is not None:
             design.path = self.path
@@ -159,6 +225,21 @@ class FileItem:
     path: Path
     code: str = field(repr=False)
 
+    def split(
+        self, chunk_size: Optional[int] = None
+    ) -> List[Union[CodeItem, FileItem]]:
+        if chunk_size is None and self.path.stat().st_size <= MIN_CHUNK_SIZE:
+            return [self]  # 小文件仍然在 worker 中读取
+        item = CodeItem(
+            priority=self.priority,
+            code=self.path.read_text(encoding="utf-8"),
+            path=self.path,
+        )
+        chunks = item.split(chunk_size)
+        if len(chunks) == 1:
+            return [self]
+        return chunks
+
     def load(
         self,
         msg_queue: Optional[Queue] = None,
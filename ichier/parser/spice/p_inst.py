@@ -1,8 +1,8 @@
 import re
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from icutk.lex import lex, MetaLexer, LexToken
-from ply.yacc import yacc
 from ...node import Instance, DesignateReference
+from ...utils.yacc import cachedYacc
 
 
 class InstLexer(MetaLexer):
@@ -84,9 +84,13 @@ class InstParser:
     def __init__(self, *args, **kwargs):
         self.lexer = InstLexer(*args, **kwargs)
         self.tokens = self.lexer.tokens
-        self.parser = yacc(module=self, debug=False, write_tables=False)
+        self.parser = cachedYacc(self, "spice_inst")
 
-    def parse(self, text: str) -> Instance:
+    def parse(self, text: str, *, fast: bool = True) -> Instance:
+        if fast:
+            inst = fastParse(text)
+            if inst is not None:
+                return inst
         return self.parser.parse(text, lexer=self.lexer)
 
     def p_error(self, t):
@@ -440,5 +444,237 @@ class InstParser:
         p[0] = {k: " ".join([v] + p[2:])}
 
 
+_WORD_TYPES = frozenset(["ID", "X", "C", "D", "L", "M", "Q", "R"])
+_PREFIX_TYPES = frozenset(["X", "C", "D", "L", "M", "Q", "R"])
+_DEVICE_TERMS = {"C": 2, "D": 2, "L": 2, "R": 2, "Q": 3, "M": 4}
+
+FastToken = Tuple[str, Any]
+
+
+def fastTokenize(text: str) -> Optional[List[FastToken]]:
+    """Split-based equivalent of `InstLexer`.
+
+    Return None if any word may be tokenized differently by the PLY lexer,
+    e.g. `a=b=c`, `$PINSx` or `$[ref]x`.
+    """
+    tokens = []
+    for word in text.split():
+        if "=" in word[1:-1]:
+            if word.count("=") != 1:
+                return None
+            arg, value = word.split("=")
+            if arg.upper() == "$T":
+                tokens.append(("TASSIGN", (arg, value)))
+            else:
+                tokens.append(("ASSIGN", (arg, value)))
+        elif word[0] == "$":
+            if word.upper() == "$PINS":
+                tokens.append(("PINS", word))
+            elif word[:5].upper() == "$PINS":
+                return None
+            elif word.startswith("$[") and "]" in word[3:]:
+                if not word.endswith("]"):
+                    return None
+                tokens.append(("DESIGNATE", DesignateReference(word[2:-1])))
+            else:
+                tokens.append(("ID", word))
+        elif word == "/":
+            tokens.append(("/", word))
+        elif len(word) > 1 and word[0].upper() in _PREFIX_TYPES:
+            tokens.append((word[0].upper(), word))
+        else:
+            tokens.append(("ID", word))
+    return tokens
+
+
+def _fastWords(tokens: List[FastToken], i: int) -> Tuple[List[str], int]:
+    words = []
+    while i < len(tokens) and tokens[i][0] in _WORD_TYPES:
+        words.append(tokens[i][1])
+        i += 1
+    return words, i
+
+
+def _fastAssigns(
+    tokens: List[FastToken], i: int
+) -> Optional[Tuple[Dict[str, str], int]]:
+    params = {}
+    while i < len(tokens):
+        ttype, value = tokens[i]
+        if ttype == "ASSIGN":
+            k, v = value
+            params[k] = v
+            i += 1
+        elif ttype == "TASSIGN":
+            # $T=0 0 0 0
+            words = [t for t, _ in tokens[i + 1 : i + 4]]
+            if len(words) != 3 or not all(t in _WORD_TYPES for t in words):
+                return None
+            k, v = value
+            params[k] = " ".join([v] + [w for _, w in tokens[i + 1 : i + 4]])
+            i += 4
+        else:
+            break
+    return params, i
+
+
+def _fastTailAssigns(tokens: List[FastToken], i: int) -> Optional[Dict[str, str]]:
+    """Assignments which must run to the end of the line."""
+    result = _fastAssigns(tokens, i)
+    if result is None or result[1] != len(tokens):
+        return None
+    return result[0]
+
+
+def _fastSubckt(tokens: List[FastToken]) -> Optional[Instance]:
+    name = tokens[0][1]
+    ref = None
+    conn = None
+    params = None
+    if len(tokens) > 2 and tokens[1][0] == "/":
+        # X0 / nch
+        # X0 / nch $PINS pin1=net1 pin2=net2
+        # X0 / nch m=1 $PINS pin1=net1 pin2=net2
+        if tokens[2][0] not in _WORD_TYPES:
+            return None
+        ref = tokens[2][1]
+        i = 3
+        if i < len(tokens) and tokens[i][0] != "PINS":
+            result = _fastAssigns(tokens, i)
+            if result is None:
+                return None
+            params, i = result
+            if not params or i + 1 >= len(tokens):
+                return None  # 必须有 $PINS 及其后的连接
+        if i < len(tokens):
+            if tokens[i][0] != "PINS":
+                return None
+            conn = _fastTailAssigns(tokens, i + 1)
+            if conn is None:
+                return None
+        return Instance(
+            reference=ref,
+            name=name,
+            connection=conn or None,
+            parameters=params,
+            prefix="X",
+        )
+
+    words, i = _fastWords(tokens, 1)
+    if not words:
+        return None
+    if i == len(tokens):
+        # X0 net1 net2 nch
+        ref = words.pop(-1)
+        conn = words
+    else:
+        ttype = tokens[i][0]
+        if ttype == "/":
+            # X0 net1 net2 / nch m=1
+            if i + 1 >= len(tokens) or tokens[i + 1][0] not in _WORD_TYPES:
+                return None
+            conn = words
+            ref = tokens[i + 1][1]
+            params = _fastTailAssigns(tokens, i + 2)
+            if params is None:
+                return None
+        elif len(words) == 1 and ttype in ("ASSIGN", "TASSIGN", "PINS"):
+            # X0 nch m=1 $PINS pin1=net1 pin2=net2
+            # X0 nch $PINS pin1=net1 pin2=net2
+            ref = words[0]
+            if ttype != "PINS":
+                result = _fastAssigns(tokens, i)
+                if result is None:
+                    return None
+                params, i = result
+                if i + 1 >= len(tokens) or tokens[i][0] != "PINS":
+                    return None
+            conn = _fastTailAssigns(tokens, i + 1)
+            if conn is None:
+                return None
+            conn = conn or None
+        elif ttype in ("ASSIGN", "TASSIGN"):
+            # X0 net1 net2 nch m=1
+            ref = words.pop(-1)
+            conn = words
+            params = _fastTailAssigns(tokens, i)
+            if params is None:
+                return None
+        else:
+            return None
+    return Instance(
+        reference=ref,
+        name=name,
+        connection=conn,
+        parameters=params or None,
+        prefix="X",
+    )
+
+
+def _fastDevice(tokens: List[FastToken], count: int) -> Optional[Instance]:
+    name = tokens[0][1]
+    words, i = _fastWords(tokens, 1)
+    if not words:
+        return None
+    params = None
+    designate = None
+    if i < len(tokens) and tokens[i][0] != "DESIGNATE":
+        result = _fastAssigns(tokens, i)
+        if result is None:
+            return None
+        params, i = result
+        if i < len(tokens):
+            # R0 net1 net2 r=1.2K $[pdk_res] length=10u
+            if tokens[i][0] != "DESIGNATE":
+                return None
+            designate = tokens[i][1]
+            others = _fastTailAssigns(tokens, i + 1)
+            if not others:
+                return None
+            params = {**params, **others}
+    elif i < len(tokens):
+        # R0 net1 net2 1.2K $[pdk_res] length=10u
+        designate = tokens[i][1]
+        params = _fastTailAssigns(tokens, i + 1)
+        if params is None:
+            return None
+
+    if designate is None:
+        # R0 net1 net2 pdk_res 1.2K length=10u
+        if len(words) <= count:
+            return None
+        ref = words[count]
+        oparams = words[count + 1 :]
+    else:
+        ref = designate
+        oparams = words[count:]
+    return Instance(
+        reference=ref,
+        name=name,
+        connection=words[:count],
+        parameters=params or None,
+        orderparams=oparams,
+        prefix=name[0],
+    )
+
+
+def fastParse(text: str) -> Optional[Instance]:
+    """Parse the common instance forms without the PLY machinery.
+
+    Return None when the line is not one of the recognized forms, the caller
+    should fall back to `InstParser` which also reports the syntax error.
+    """
+    tokens = fastTokenize(text)
+    if not tokens:
+        return None
+    ttype = tokens[0][0]
+    if ttype == "X":
+        return _fastSubckt(tokens)
+    elif ttype in _DEVICE_TERMS:
+        return _fastDevice(tokens, _DEVICE_TERMS[ttype])
+    else:
+        return None
+
+
 def parse(text: str) -> Instance:
     return InstParser().parse(text)
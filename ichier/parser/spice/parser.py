@@ -32,11 +32,12 @@ class SpiceIncludeError(SpiceFormatError):
 def parse(
     lineiter: LineIterator,
     priority: Tuple[int, ...] = (),
+    lineno_offset: int = 0,
 ) -> Design:
     inst_parser = InstParser()
     design = Design(priority=priority)
     for line in lineiter:
-        lineno = lineiter.line
+        lineno = lineiter.line + lineno_offset
         if line.upper().startswith(".SUBCKT"):
             lineiter.revert()
             module = parseSubckt(lineiter, inst_parser=inst_parser)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 from pathlib import Path
 from multiprocessing import Pool
 from queue import Queue
@@ -9,6 +9,7 @@ import os
 
 from ichier import Design
 from .parser import VerilogParser
+from ..chunk import autoChunkSize, loadItems
 
 __all__ = []
 
@@ -18,6 +19,8 @@ def fromFile(
     *,
     rebuild: bool = False,
     msg_queue: Optional[Queue] = None,
+    chunk_size: Optional[int] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Design:
     path = Path(file)
     return fromCode(
@@ -25,6 +28,8 @@ def fromFile(
         rebuild=rebuild,
         path=path,
         msg_queue=msg_queue,
+        chunk_size=chunk_size,
+        cache_dir=cache_dir,
     )
 
 
@@ -34,14 +39,21 @@ def fromCode(
     rebuild: bool = False,
     path: Optional[Union[str, Path]] = None,
     msg_queue: Optional[Queue] = None,
+    chunk_size: Optional[int] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
 ) -> Design:
-    args_array = [(item, msg_queue) for item in parseInclude(file=str(path), code=code)]
-    # designs = [worker(*args) for args in args_array]
-    with Pool() as pool:
-        designs = pool.starmap(worker, args_array)
-    design = Design()
-    for d in designs:
-        design.includeOtherDesign(d)
+    def run(items: list) -> list:
+        args_array = [(item, msg_queue) for item in items]
+        # return [worker(*args) for args in args_array]
+        with Pool() as pool:
+            return pool.starmap(worker, args_array)
+
+    design = loadItems(
+        parseInclude(file=str(path), code=code),
+        run,
+        chunk_size=chunk_size,
+        cache_dir=cache_dir,
+    )
     if rebuild:
         design.modules.rebuild(verilog_style=True)
     if path is not None:
@@ -67,6 +79,61 @@ def worker(
     return design
 
 
+_MODULE_SCANNER = re.compile(
+    r"""
+    (?P<skip>
+        \\\S+                          # \escaped_id
+      | "[^"]*"                         # "string"
+      | `\w.*                           # `timescale ...
+      | //.*                            # line comment
+      | /\*(?:[^*]|\*(?!/))*\*/         # block comment
+      | \(\*(?:[^*]|\*(?!\)))*\*\)      # (* attribute *)
+    )
+    | (?<!\w)(?P<keyword>endmodule|module)(?!\w)
+    """,
+    re.VERBOSE,
+)
+
+
+def splitModules(code: str, chunk_size: int) -> List[Tuple[int, str]]:
+    """Split the code into chunks of about `chunk_size` characters.
+
+    The chunks are only cut in front of a top-level `module` keyword, comments,
+    strings and escaped identifiers are skipped. Returns `(lineno_offset, code)`
+    pairs, the offset is the number of lines counted by the lexer before the
+    chunk.
+    """
+    if len(code) <= chunk_size:
+        return [(0, code)]
+    chunks = []
+    start = 0
+    lineno_offset = 0
+    string_lines = 0  # 词法分析器不计入字符串中的换行
+    inside = False
+    found = False  # 当前块中是否已有 module
+    for m in _MODULE_SCANNER.finditer(code):
+        keyword = m.group("keyword")
+        if keyword is None:
+            if m.group().startswith('"'):
+                string_lines += m.group().count("\n")
+        elif keyword == "endmodule":
+            inside = False
+        elif inside:
+            continue
+        elif not found:
+            inside = found = True
+        else:
+            inside = True
+            if m.start() - start >= chunk_size:
+                chunk = code[start : m.start()]
+                chunks.append((lineno_offset, chunk))
+                lineno_offset += chunk.count("\n") - string_lines
+                string_lines = 0
+                start = m.start()
+    chunks.append((lineno_offset, code[start:]))
+    return chunks
+
+
 class PreProc:
     @staticmethod
     def process(code: str) -> str:
@@ -155,6 +222,7 @@ class CodeItem:
     path: Optional[Path] = None
     removed_comments: bool = False
     removed_alone_wires: bool = False
+    lineno_offset: int = 0
 
     def __post_init__(self):
         if self.code != "":
@@ -163,6 +231,24 @@ class CodeItem:
             if not self.removed_alone_wires:
                 self.code = PreProc.removeAloneWires(self.code)
 
+    def split(self, chunk_size: Optional[int] = None) -> List[CodeItem]:
+        if chunk_size is None:
+            chunk_size = autoChunkSize(len(self.code))
+        chunks = splitModules(self.code, chunk_size)
+        if len(chunks) == 1:
+            return [self]
+        return [
+            CodeItem(
+                priority=self.priority,
+                code=code,
+                path=self.path,
+                removed_comments=True,
+                removed_alone_wires=True,
+                lineno_offset=self.lineno_offset + offset,
+            )
+            for offset, code in chunks
+        ]
+
     def load(
         self,
         msg_queue: Optional[Queue] = None,
@@ -171,6 +257,7 @@ class CodeItem:
             priority=self.priority,
             path=self.path,
             msg_queue=msg_queue,
+            lineno_offset=self.lineno_offset,
         )
         return vparser.parse(self.code)
 
@@ -192,14 +279,20 @@ class FileItem:
             if not self.removed_alone_wires:
                 self.code = PreProc.removeAloneWires(self.code)
 
-    def load(
-        self,
-        msg_queue: Optional[Queue] = None,
-    ) -> Design:
+    def split(self, chunk_size: Optional[int] = None) -> List[CodeItem]:
+        return self.toCodeItem().split(chunk_size)
+
+    def toCodeItem(self) -> CodeItem:
         return CodeItem(
             priority=self.priority,
             code=self.code,
             path=self.path,
-            removed_comments=self.removed_comments,
-            removed_alone_wires=self.removed_alone_wires,
-        ).load(msg_queue=msg_queue)
+            removed_comments=True,  # 已在 __post_init__ 中处理
+            removed_alone_wires=True,
+        )
+
+    def load(
+        self,
+        msg_queue: Optional[Queue] = None,
+    ) -> Design:
+        return self.toCodeItem().load(msg_queue=msg_queue)
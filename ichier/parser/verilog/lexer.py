@@ -39,6 +39,7 @@ class VerilogLexer(BaseLexer):
         path: Optional[Union[str, Path]] = None,
         priority: Tuple[int, ...] = (),
         msg_queue: Optional[Queue] = None,
+        lineno_offset: int = 0,
     ) -> None:
         if path is None:
             self.path = None
@@ -46,6 +47,7 @@ class VerilogLexer(BaseLexer):
             self.path = Path(path)
         self.priority = priority
         self.msg_queue = msg_queue
+        self.lineno_offset = lineno_offset
 
         self.id: str = uuid4().hex
         pid = current_process().pid
@@ -61,6 +63,7 @@ class VerilogLexer(BaseLexer):
 
     def input(self, *args, **kwargs) -> None:
         super().input(*args, **kwargs)
+        self.lexer.lineno = 1 + self.lineno_offset  # 代码块在原文件中的起始行号
         if self.lexer.lexdata is None:
             self.total_lines = 0
         else:
@@ -95,11 +98,10 @@ class VerilogLexer(BaseLexer):
     def cb_newline(self) -> None:
         if self.msg_queue is None:
             return
-        percent = int(self.lexer.lineno / self.total_lines * 100)
+        current = self.lexer.lineno - self.lineno_offset
+        percent = int(current / self.total_lines * 100)
         if percent > self.last_percent:
-            self.msg_queue.put(
-                dict(pid=self.pid, type="current", value=self.lexer.lineno)
-            )
+            self.msg_queue.put(dict(pid=self.pid, type="current", value=current))
             self.last_percent = percent
 
     def cb_done(self) -> None:
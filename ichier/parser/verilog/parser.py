@@ -1,10 +1,9 @@
 from typing import Dict, List, Literal, Optional, Union
 from dataclasses import dataclass
 
-from ply.yacc import yacc
-
 from .lexer import VerilogLexer
 from ichier import Design, Module, Instance, Terminal, Net
+from ichier.utils.yacc import cachedYacc
 
 __all__ = [
     "VerilogParser",
@@ -45,7 +44,7 @@ class VerilogParser:
     def __init__(self, *args, **kwargs):
         self.lexer = VerilogLexer(*args, **kwargs)
         self.tokens = self.lexer.tokens
-        self.parser = yacc(module=self, debug=False, write_tables=False)
+        self.parser = cachedYacc(self, "verilog")
 
     def parse(self, text: str) -> Design:
         design: Design = self.parser.parse(text, lexer=self.lexer)
@@ -78,7 +77,8 @@ class VerilogParser:
                           |  design_item
         """
         if len(p) == 3:
-            p[0] = p[1] + [p[2]]
+            p[0] = p[1]
+            p[0].append(p[2])
         else:
             p[0] = [p[1]]
 
@@ -159,7 +159,8 @@ class VerilogParser:
                           |  module_item
         """
         if len(p) == 3:
-            p[0] = p[1] + [p[2]]
+            p[0] = p[1]
+            p[0].append(p[2])
         else:
             p[0] = [p[1]]
 
@@ -249,7 +250,8 @@ class VerilogParser:
                                |  connect_by_order
         """
         if len(p) == 4:
-            p[0] = p[1] + [p[3]]
+            p[0] = p[1]
+            p[0].append(p[3])
         else:
             p[0] = [p[1]]
 
@@ -378,7 +380,8 @@ class VerilogParser:
                  |  id
         """
         if len(p) == 4:
-            p[0] = p[1] + [p[3]]
+            p[0] = p[1]
+            p[0].append(p[3])
         else:
             p[0] = [p[1]]
 
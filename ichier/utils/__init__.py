@@ -1,12 +1,17 @@
-from typing import Dict, Iterable, Optional, Union, overload
+from typing import Dict, Iterable, List, Optional, Union, overload
 
 from .name_parse import bitInfoSplit, parse as nameparse
+from .stream import openTextWriter
+from .wrap import wrapTokens
 
 __all__ = [
     "bitInfoSplit",
     "flattenSequence",
     "parseMemName",
+    "parseMemNames",
     "expandTermNetPairs",
+    "openTextWriter",
+    "wrapTokens",
 ]
 
 
@@ -29,11 +34,19 @@ def flattenSequence(data):
 
 def parseMemName(name: str, flatten: bool = False) -> Union[str, list, tuple]:
     result = nameparse(name)
-    if flatten:
+    if flatten and isinstance(result, tuple):
         result = flattenSequence(result)
     return result
 
 
+def parseMemNames(
+    names: Iterable[str],
+    flatten: bool = False,
+) -> List[Union[str, tuple]]:
+    """Parse a batch of name expressions, one result per name."""
+    return [parseMemName(name, flatten=flatten) for name in names]
+
+
 def expandTermNetPairs(
     term: Union[str, Iterable[str]],
     net: Union[str, Iterable[str]],
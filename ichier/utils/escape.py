@@ -31,6 +31,9 @@ class EscapeString(str):
     def __str__(self):
         return f"{super().__str__()}"
 
+    def __getnewargs__(self):
+        return ("\\" + super().__str__(),)  # 保证可以在进程间传递
+
 
 def makeSafeString(s: str) -> Union[str, EscapeString]:
     if isinstance(s, EscapeString):
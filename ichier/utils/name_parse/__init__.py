@@ -1,18 +1,44 @@
-from typing import List, Sequence, Tuple, Optional
+from functools import lru_cache
+from typing import Sequence, Tuple, Optional, Union
 import re
+import threading
 
 from .parser import Parser
 from ..escape import EscapeString
 
 __all__ = [
+    "CACHE_SIZE",
+    "getParser",
     "parse",
     "merge",
     "bitInfoSplit",
 ]
 
+CACHE_SIZE = 1 << 16  # 缓存的名称表达式数量上限
 
-def parse(name: str) -> List[str]:
-    return Parser().parse(name)
+_BIT_MEMBER = re.compile(
+    r"(?P<head>[a-zA-Z_]\w*)(?:\[(?P<index>\d+)\]|<(?P<aindex>\d+)>)"
+)
+
+# PLY 的 lexer 和 parser 保存了解析状态，每个线程使用各自的实例
+_local = threading.local()
+
+
+def getParser() -> Parser:
+    """The parser of the current thread, it is created on the first use."""
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = Parser()
+    return parser
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(name: str) -> Union[str, tuple]:
+    """Parse a name expression, the results are memoized.
+
+    The result is a string for a single name, otherwise an immutable tuple.
+    """
+    return getParser().parse(name)
 
 
 def merge(names: Sequence[str]) -> str: ...
@@ -21,9 +47,7 @@ def merge(names: Sequence[str]) -> str: ...
 def bitInfoSplit(name: str) -> Tuple[str, Optional[int]]:
     if isinstance(name, EscapeString):
         return name, None
-    if m := re.fullmatch(r"(?P<head>[a-zA-Z_]\W*)\[(?P<index>\d+)\]", name):
-        return m.group("head"), int(m.group("index"))
-    elif m := re.fullmatch(r"(?P<head>[a-zA-Z_]\W*)<(?P<index>\d+)>", name):
-        return m.group("head"), int(m.group("index"))
+    if m := _BIT_MEMBER.fullmatch(name):
+        return m.group("head"), int(m.group("index") or m.group("aindex"))
     else:
         return name, None
@@ -1,6 +1,5 @@
-from ply.yacc import yacc
-
 from .lexer import Lexer
+from ..yacc import cachedYacc
 
 
 class NameGroup(tuple):
@@ -103,7 +102,7 @@ class Parser:
     def __init__(self):
         self.lexer = Lexer()
         self.tokens = self.lexer.tokens
-        self.parser = yacc(module=self, debug=False, write_tables=False)
+        self.parser = cachedYacc(self, "name_parse")
 
     def parse(self, text):
         return self.parser.parse(text, lexer=self.lexer)
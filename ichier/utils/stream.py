@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+import gzip
+import io
+
+__all__ = [
+    "openTextWriter",
+]
+
+
+@contextmanager
+def openTextWriter(target: Union[str, Path, IO]) -> Iterator[IO[str]]:
+    """Open a text writer on a path or a text or binary stream.
+
+    A path ending with ".gz" is written with gzip. Text is UTF-8 encoded and
+    newlines are written as is. Streams passed in are flushed but not closed.
+    """
+    if isinstance(target, (str, Path)):
+        path = Path(target)
+        if path.suffix == ".gz":
+            f = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            f = open(path, "w", encoding="utf-8", newline="")
+        with f:
+            yield f
+    elif isinstance(target, io.TextIOBase):
+        yield target
+    elif hasattr(target, "write"):
+        # 二进制流，例如 gzip.open(path, "wb")，写完后分离，不关闭调用者的流
+        f = io.TextIOWrapper(target, encoding="utf-8", newline="")
+        try:
+            yield f
+        finally:
+            f.flush()
+            f.detach()
+    else:
+        raise TypeError(f"target must be a path or a writable stream - {target!r}")
@@ -0,0 +1,40 @@
+__all__ = [
+    "wrapTokens",
+]
+
+
+def wrapTokens(
+    text: str,
+    width: int,
+    indent: str = "+ ",
+    initial: str = "",
+) -> str:
+    """Wrap the space separated tokens of the text into lines.
+
+    Lines are at most `width` characters, the first starts with `initial` and
+    the others with `indent`. Tokens are packed greedily like `textwrap.wrap`,
+    but never split: a token longer than a line is put on its own line.
+    The text is kept on one line if `width` is not positive.
+    """
+    tokens = text.split()
+    if not tokens:
+        return ""
+    line = " ".join(tokens)
+    if width <= 0 or len(initial) + len(line) <= width:
+        return initial + line  # 多数行不需要换行
+
+    lines = []
+    buf = [tokens[0]]
+    size = len(initial) + len(tokens[0])
+    head = initial
+    for token in tokens[1:]:
+        size += 1 + len(token)
+        if size <= width:
+            buf.append(token)
+        else:
+            lines.append(head + " ".join(buf))
+            head = indent
+            buf = [token]
+            size = len(indent) + len(token)
+    lines.append(head + " ".join(buf))
+    return "\n".join(lines)
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Any, Optional
+import hashlib
+import os
+import pickle
+
+from icutk.log import getLogger
+from ply import __version__ as ply_version
+from ply.yacc import LRParser, ParserReflect, yacc
+
+__all__ = [
+    "cacheDir",
+    "cachedYacc",
+]
+
+
+def cacheDir() -> Optional[Path]:
+    """The per-user cache directory of ichier.
+
+    `$ICHIER_CACHE_DIR` takes precedence, set it to an empty string to disable
+    the cache. Otherwise `$XDG_CACHE_HOME/ichier` or `~/.cache/ichier` is used.
+    """
+    value = os.environ.get("ICHIER_CACHE_DIR")
+    if value is not None:
+        if value == "":
+            return None
+        return Path(value).expanduser()
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    if xdg:
+        return Path(xdg) / "ichier"
+    return Path.home() / ".cache" / "ichier"
+
+
+def cachedYacc(module: Any, name: str) -> LRParser:
+    """Build a PLY parser, reuse the LALR tables pickled in the cache directory.
+
+    The table file is keyed by the grammar signature, so a changed grammar never
+    loads stale tables. Fall back to building the tables in memory if the cache
+    directory is disabled or not writable.
+    """
+    logger = getLogger(__name__)  # 是否使用缓存，语法警告都输出到同一个日志
+    directory = cacheDir()
+    if directory is not None:
+        directory = directory / "ply"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            directory = None
+    if directory is None:
+        return yacc(module=module, debug=False, write_tables=False, errorlog=logger)
+
+    pinfo = ParserReflect({k: getattr(module, k) for k in dir(module)})
+    pinfo.get_all()
+    digest = hashlib.sha1(f"{ply_version}:{pinfo.signature()}".encode()).hexdigest()
+    path = directory / f"{name}-{digest[:16]}.pickle"
+
+    if path.exists():
+        try:
+            return yacc(
+                module=module,
+                debug=False,
+                write_tables=False,
+                picklefile=str(path),
+                errorlog=logger,
+            )
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"Broken parse table cache {str(path)!r}, regenerate - {e}")
+
+    # 先写入临时文件再替换，避免多个进程同时读写同一个文件
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    parser = yacc(
+        module=module,
+        debug=False,
+        write_tables=False,
+        picklefile=str(tmp),
+        errorlog=logger,
+    )
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return parser
@@ -23,3 +23,13 @@ class TestInstance:
         inst.rebuild()
         assert isinstance(inst.connection, list)
         assert "Term" not in inst.connection
+
+    def test_empty_parameters(self):
+        a = Instance(name="a", reference="ref_1")
+        b = Instance(name="b", reference="ref_1")
+        assert not hasattr(a, "__dict__")
+        assert a.dumpToSpice() == "Xa / ref_1 $PINS"
+        a.parameters["w"] = "1u"
+        a.orderparams.append("2")
+        assert a.dumpToSpice() == "Xa ref_1 2 w=1u"
+        assert not b.parameters and not b.orderparams
@@ -1,3 +1,8 @@
+import pickle
+import random
+
+import pytest
+
 from ichier.node import (
     Design,
     Module,
@@ -7,6 +12,7 @@ from ichier.node import (
     NetCollection,
     TerminalCollection,
     ParameterCollection,
+    Terminal,
 )
 
 
@@ -35,3 +41,220 @@ class TestFig:
         assert i.name == name
         assert i.reference == "module"
         assert isinstance
+
+    def test_lazy_uuid(self):
+        m = Module("module")
+        assert m._Fig__uuid is None
+        uuid = m.uuid
+        assert m.uuid is uuid
+        unnamed = Module()
+        assert unnamed.name == f"Module_{unnamed.uuid.hex:.8}"
+        assert unnamed.name == unnamed.name
+
+    def test_positional_index(self):
+        m = Module("module", terminals=[Terminal(name) for name in "ABCDE"])
+        terms = m.terminals
+
+        def check():
+            assert [terms[i].name for i in range(len(terms))] == list(terms.keys())
+            assert terms[-1].name == list(terms.keys())[-1]
+
+        check()
+        terms.append(Terminal("F"))
+        check()
+        del terms["C"]
+        check()
+        terms["B"].name = "X"  # 重命名后移动到末尾
+        check()
+        assert terms[-1].name == "X"
+        terms.pop("A")
+        terms.pop("F")
+        check()
+        terms.popitem()
+        check()
+        assert [t.name for t in terms] == ["D", "E"]
+        terms = pickle.loads(pickle.dumps(m)).terminals
+        check()
+        terms.append(Terminal("G"))
+        check()
+        terms.clear()
+        assert len(terms) == 0
+        terms.extend(Terminal(f"T{i}") for i in range(8))
+        check()
+        keys = terms._Collection__keys
+        del terms["T2"]
+        terms["T4"].name = "Y"
+        terms.pop("T6")
+        assert terms._Collection__keys is keys  # 删除和重命名只留下空位
+        assert terms._Collection__holes == 3
+        terms.pop("Y")
+        terms.popitem()
+        check()
+        assert [t.name for t in terms] == ["T0", "T1", "T3", "T5"]
+        rng = random.Random(0)
+        for i in range(300):
+            if rng.random() < 0.4 and len(terms) > 1:
+                terms.pop(terms[rng.randrange(len(terms))].name)
+            else:
+                terms.append(Terminal(f"N{i}"))
+            check()
+            j = rng.randrange(len(terms))
+            assert terms[j].name == list(terms.keys())[j]
+
+    def test_live_iteration(self):
+        m = Module("module", terminals=[Terminal(name) for name in "ABC"])
+        assert [t.name for t in m.terminals] == ["A", "B", "C"]
+        with pytest.raises(RuntimeError):
+            for t in m.terminals:
+                m.terminals.remove(t.name)
+        for t in m.terminals.figs:
+            m.terminals.remove(t.name)
+        assert len(m.terminals) == 0
+
+    def test_find(self):
+        names = ["b1", "a", "ab", "a.b", "A[0]", "abc", "b2"]
+        m = Module("module", terminals=[Terminal(name) for name in names])
+        terms = m.terminals
+
+        def find(*args, **kwargs):
+            return [t.name for t in terms.find(*args, **kwargs)]
+
+        assert find("ab") == ["ab"]
+        assert find("ab.*") == ["ab", "abc"]
+        assert find("a.b") == ["a.b"]
+        assert find(r"b\d") == ["b1", "b2"]
+        assert find("AB", ignorecase=True) == ["ab"]
+        assert find("a*", mode="glob") == ["a", "ab", "a.b", "abc"]
+        assert find("A[[]?]", mode="glob") == ["A[0]"]
+        terms.append(Terminal("ab2"))
+        terms.remove("ab")
+        assert find("ab.*") == ["abc", "ab2"]
+        assert next(terms.iterFind(".*")) == ("b1", terms["b1"])
+        assert find("b1", target="value") == ["b1"]
+
+    def test_master_cache(self):
+        inv = Module("inv")
+        top = Module("top", instances=[Instance("inv", "X0")])
+        d = Design("design", modules=[top, inv])
+        ref = top.instances["X0"].reference
+        assert ref.getMaster() is inv
+        assert ref.getMaster() is inv
+        d.modules.remove("inv")
+        assert ref.getMaster() is None
+        d.modules.append(inv)
+        assert ref.getMaster() is inv
+        assert d.modules.pop("inv") is inv
+        assert inv.collection is None
+        assert ref.getMaster() is None
+        d.modules.append(inv)
+        assert d.modules.popitem() == ("inv", inv)
+        assert ref.getMaster() is None
+        d.modules.append(inv)
+        inv.name = "inv2"
+        assert ref.getMaster() is None
+        other = Module("inv")
+        Design("other", modules=[other])
+        other.getDesign().modules.append(d.modules.pop("top"))
+        assert ref.getMaster() is other
+        copy = pickle.loads(pickle.dumps(other.getDesign()))
+        assert copy.modules["top"].instances["X0"].reference.getMaster().name == "inv"
+
+    def test_flat_counts(self):
+        inv = Module(
+            "inv",
+            instances=[
+                Instance("nch", "M0", prefix="M"),
+                Instance("pch", "M1", prefix="M"),
+                Instance("rppoly", "R0", prefix="r"),
+            ],
+        )
+        buf = Module("buf", instances=[Instance("inv", "X0"), Instance("inv", "X1")])
+        top = Module(
+            "top",
+            instances=[
+                Instance("buf", "X0"),
+                Instance("buf", "X1"),
+                Instance("inv", "X2"),
+                Instance("bbox", "X3"),
+                Instance(None, "X4"),
+            ],
+        )
+        d = Design("design", modules=[inv, buf, top])
+        counts = d.getFlatCounts()
+        assert counts["top"] == {
+            "instances": 17,
+            "references": {
+                "buf": 2,
+                "inv": 5,
+                "bbox": 1,
+                "nch": 5,
+                "pch": 5,
+                "rppoly": 5,
+            },
+            "devices": {"M": 10, "R": 5},
+        }
+        assert d.getFlatCounts() is counts
+        assert top.summary("detail")["flat"] == counts["top"]
+        inv.instances.remove("R0")
+        assert d.getFlatCounts()["top"]["devices"] == {"M": 10}
+        buf.instances["X1"].reference = "bbox"
+        assert d.getFlatCounts()["top"]["references"]["bbox"] == 3
+        assert Module(
+            "alone", instances=[Instance("nch", "M0", prefix="M")]
+        ).getFlatCounts() == {
+            "instances": 1,
+            "references": {"nch": 1},
+            "devices": {"M": 1},
+        }
+        copy = pickle.loads(pickle.dumps(d))
+        assert copy.getFlatCounts() == d.getFlatCounts()
+        flat = top.summary("detail")["flat"]
+        flat["references"]["inv"] = 0
+        assert d.getFlatCounts()["top"]["references"]["inv"] == 3
+        top.instances.pop("X2")
+        assert d.getFlatCounts()["top"]["references"]["inv"] == 2
+        d.modules.pop("buf")
+        assert d.getFlatCounts()["top"]["instances"] == 4
+        inv.instances["M0"].prefix = "q"
+        assert d.getFlatCounts()["inv"]["devices"] == {"M": 1, "Q": 1}
+        assert copy.getFlatCounts()["top"]["devices"] == {"M": 6}
+
+    def test_reference_graph(self):
+        inv = Module("inv", instances=[Instance("nch", "M0"), Instance("pch", "M1")])
+        buf = Module("buf", instances=[Instance("inv", "X0"), Instance("inv", "X1")])
+        top = Module("top", instances=[Instance("buf", "X0"), Instance(None, "X1")])
+        spare = Module("spare")
+        d = Design("design", modules=[inv, buf, top, spare])
+        modules = d.modules
+        assert modules.getTopLevels() == (top, spare)
+        assert modules.getLeaves() == (inv, spare)
+        assert modules.getUnused() == (spare,)
+        assert modules.getMissingMasters() == {"nch": (inv,), "pch": (inv,)}
+        assert modules.getReferrers("inv") == {buf: 2}
+        buf.instances.pop("X0")
+        assert modules.getReferrers("inv") == {buf: 1}
+        buf.instances["X1"].reference = "nch"
+        assert modules.getLeaves() == (inv, buf, spare)
+        assert modules.getTopLevels() == (inv, top, spare)
+        top.instances.append(Instance("spare", "X2"))
+        assert modules.getUnused() == (inv,)
+        modules.pop("buf")
+        assert modules.getMissingMasters()["buf"] == (top,)
+        modules.append(buf)
+        assert "buf" not in modules.getMissingMasters()
+
+    def test_reference_graph_rename(self):
+        inv = Module("inv", instances=[Instance("nch", "M0")])
+        top = Module("top", instances=[Instance("inv", "X0")])
+        d = Design("design", modules=[inv, top])
+        assert d.modules.getLeaves() == (inv,)
+        inv.name = "inv2"
+        # top 例化的 inv 已不存在
+        assert d.modules.getLeaves() == (top, inv)
+        assert d.modules.getTopLevels() == (top, inv)
+        assert d.modules.getMissingMasters()["inv"] == (top,)
+        top.instances["X0"].reference = "inv2"
+        assert d.modules.getLeaves() == (inv,)
+        assert d.modules.getTopLevels() == (top,)
+        copy = pickle.loads(pickle.dumps(d))
+        assert [m.name for m in copy.modules.getLeaves()] == ["inv2"]
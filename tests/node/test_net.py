@@ -0,0 +1,287 @@
+import pickle
+
+import pytest
+
+from ichier.node import Design, Instance, InstanceHierPath, Module, Net, Terminal
+
+
+class TestNetConnects:
+    def make(self) -> Module:
+        return Module(
+            name="buf",
+            nets=[Net("A"), Net("Z"), Net("inter")],
+            instances=[
+                Instance("inv", "X0", {"A": "A", "Z": "inter"}),
+                Instance("inv", "X1", ["inter", "Z"]),
+            ],
+        )
+
+    def test_index(self):
+        m = self.make()
+        x0, x1 = m.instances
+        assert m.instances.getNetConnects("inter") == ((x0, "Z"), (x1, 0))
+        assert m.instances.getNetConnects("none") == ()
+        assert m.nets["inter"].getAssocInstances() == (x0, x1)
+        route = m.nets["inter"].trace()
+        assert [c.instance for c in route.connect_collection] == [x0, x1]
+
+    def test_invalidate(self):
+        m = self.make()
+        x0, x1 = m.instances
+        assert m.nets["A"].getAssocInstances() == (x0,)
+        x1.connection = ["A", "Z"]
+        assert m.nets["A"].getAssocInstances() == (x0, x1)
+        m.instances.remove("X0")
+        assert m.nets["A"].getAssocInstances() == (x1,)
+        x2 = Instance("inv", "X2", {"A": "inter", "Z": "A"})
+        m.instances.append(x2)
+        assert m.nets["A"].getAssocInstances() == (x1, x2)
+        m = pickle.loads(pickle.dumps(m))
+        assert [i.name for i in m.nets["A"].getAssocInstances()] == ["X1", "X2"]
+
+    def test_invalidate_pop(self):
+        m = self.make()
+        x0, x1 = m.instances
+        assert m.nets["A"].getAssocInstances() == (x0,)
+        assert m.instances.pop("X0") is x0
+        assert m.nets["A"].getAssocInstances() == ()
+        assert m.nets["inter"].getAssocInstances() == (x1,)
+        assert m.instances.popitem() == ("X1", x1)
+        assert m.nets["inter"].getAssocInstances() == ()
+
+    def test_invalidate_in_place(self):
+        m = self.make()
+        x0, x1 = m.instances
+        assert m.nets["A"].getAssocInstances() == (x0,)
+        x0.connection["A"] = "inter"
+        assert m.nets["A"].getAssocInstances() == ()
+        x1.connection[0] = "A"
+        assert m.nets["A"].getAssocInstances() == (x1,)
+        assert m.nets["inter"].getAssocInstances() == (x0,)
+        x1.connection.append("inter")
+        assert m.nets["inter"].getAssocInstances() == (x0, x1)
+        del x0.connection["A"]
+        x1.connection.pop()
+        assert m.nets["inter"].getAssocInstances() == (x0,)
+        x2 = pickle.loads(pickle.dumps(m)).instances["X1"]
+        x2.connection[0] = "Z"
+        assert x2.getModule().nets["Z"].getAssocInstances() == (x2,)
+        x3 = x1.copy("X3")
+        assert x3.connection == x1.connection
+        assert x3.connection is not x1.connection
+
+
+class TestBusIndex:
+    def test_bus(self):
+        m = Module(
+            name="top",
+            nets=[Net("D[1]"), Net("D[0]"), Net("D<2>"), Net("D"), Net("DD[0]")],
+        )
+        assert [n.name for n in m.nets.getBus("D")] == ["D[1]", "D[0]"]
+        assert [b for b, _ in m.nets.getBusBits("D", "<>")] == [2]
+        assert m.nets.getBus("E") == ()
+        m.nets.append(Net("D[2]"))
+        m.nets.remove("D[1]")
+        assert [n.name for n in m.nets.getBus("D")] == ["D[0]", "D[2]"]
+        m.nets["D[0]"].name = "E[0]"
+        assert [n.name for n in m.nets.getBus("E")] == ["E[0]"]
+        assert [n.name for n in m.nets.getBus("D")] == ["D[2]"]
+
+    def test_rebuild(self):
+        cell = Module("cell", terminals=[Terminal("A[1]"), Terminal("A[0]")])
+        top = Module(
+            "top",
+            nets=[Net("n[1]"), Net("n[0]")],
+            instances=[Instance("cell", "X0", {"A": "n"}), Instance("bb", "X1", ["n"])],
+        )
+        Design("design", modules=[cell, top])
+        top.instances.rebuild(mute=True, verilog_style=True)
+        assert top.instances["X0"].connection == {"A[1]": "n[1]", "A[0]": "n[0]"}
+        assert top.instances["X1"].connection == ["n[1]", "n[0]"]
+
+
+class TestTraceCache:
+    def make(self) -> Design:
+        inv = Module(
+            "inv",
+            terminals=[Terminal("A"), Terminal("Z")],
+            nets=[Net("A"), Net("Z")],
+            instances=[Instance("nch", "M0", {"G": "A", "D": "Z"})],
+        )
+        top = Module(
+            "top",
+            nets=[Net("A"), Net("B")],
+            instances=[
+                Instance("inv", "X0", {"A": "A", "Z": "B"}),
+                Instance("inv", "X1", ["A", "B"]),
+            ],
+        )
+        return Design("design", modules=[inv, top])
+
+    def test_shared(self):
+        d = self.make()
+        route = d.modules["top"].nets["A"].trace()
+        x0, x1 = route.connect_collection
+        assert x0.route is x1.route
+        assert x0.route.net is d.modules["inv"].nets["A"]
+        assert d.modules["top"].nets["A"].trace() is route
+        shallow = d.modules["top"].nets["A"].trace(depth=0)
+        assert shallow is not route
+        assert all(c.route is None for c in shallow.connect_collection)
+
+    def test_invalidate(self):
+        d = self.make()
+        top = d.modules["top"]
+        route = top.nets["A"].trace()
+        top.instances["X1"].connection.append("C")
+        assert top.nets["A"].trace() is not route
+        route = top.nets["A"].trace()
+        d.modules["inv"].instances["M0"].connection["G"] = "Z"
+        assert top.nets["A"].trace().connect_collection[0].route is None
+        d.modules["inv"].instances["M0"].connection = {"G": "A"}
+        route = top.nets["A"].trace()
+        assert route.connect_collection[1].route is not None
+        d.modules["inv"].terminals.remove("A")
+        d.modules["inv"].terminals.append(Terminal("A"))
+        route = top.nets["A"].trace()
+        assert route.connect_collection[1].route is None
+        top.instances["X0"].reference = "buf"
+        assert top.nets["A"].trace().connect_collection[0].route is None
+        copy = pickle.loads(pickle.dumps(d))
+        assert len(copy.modules["top"]._routes) == 0
+
+    def test_scope(self):
+        d, other = self.make(), self.make()
+        top, inv = d.modules["top"], d.modules["inv"]
+        route = top.nets["A"].trace()
+        other.modules["inv"].instances.pop("M0")
+        assert top.nets["A"].trace() is route  # 其他设计的修改不影响缓存
+        assert inv.instances.pop("M0").name == "M0"
+        assert top.nets["A"].trace().connect_collection[0].route is None
+        inv.instances.append(Instance("nch", "M0", {"G": "A"}))
+        assert top.nets["A"].trace().connect_collection[0].route is not None
+        inv.instances.popitem()
+        assert top.nets["A"].trace().connect_collection[0].route is None
+
+
+class TestIterTrace:
+    @staticmethod
+    def name(path: InstanceHierPath) -> str:
+        return "/".join(inst.name for inst in path)
+
+    def make(self) -> Design:
+        inv = Module(
+            "inv",
+            terminals=[Terminal("A"), Terminal("Z")],
+            nets=[Net("A"), Net("Z")],
+            instances=[
+                Instance("nch", "M0", {"G": "A", "D": "Z"}),
+                Instance("pch", "M1", {"G": "A", "D": "Z"}),
+            ],
+        )
+        top = Module(
+            "top",
+            nets=[Net("A"), Net("B")],
+            instances=[
+                Instance("inv", "X0", {"A": "A", "Z": "B"}),
+                Instance("inv", "X1", ["A", "B"]),
+            ],
+        )
+        return Design("design", modules=[inv, top])
+
+    def test_hits(self):
+        d = self.make()
+        hits = [
+            (self.name(p), t, n.name)
+            for p, t, n in d.modules["top"].nets["A"].iterTrace()
+        ]
+        assert hits == [
+            ("X0", "A", "A"),
+            ("X0/M0", "G", "A"),
+            ("X0/M1", "G", "A"),
+            ("X1", 0, "A"),
+            ("X1/M0", "G", "A"),
+            ("X1/M1", "G", "A"),
+        ]
+        path = next(
+            p for p, _, _ in d.modules["top"].nets["A"].iterTrace() if len(p) > 1
+        )
+        assert isinstance(path, InstanceHierPath)
+        assert path.parent == [d.modules["top"].instances["X0"]]
+        inv_a = d.modules["inv"].nets["A"]
+        assert [n for _, _, n in d.modules["top"].nets["A"].iterTrace()][1] is inv_a
+
+    def test_limits(self):
+        a = self.make().modules["top"].nets["A"]
+        assert [self.name(p) for p, _, _ in a.iterTrace(depth=0)] == ["X0", "X1"]
+        assert [self.name(p) for p, _, _ in a.iterTrace(fanout=1)] == ["X0", "X0/M0"]
+        assert [self.name(p) for p, _, _ in a.iterTrace(unique=True)] == [
+            "X0",
+            "X0/M0",
+            "X0/M1",
+            "X1",
+        ]
+        it = a.iterTrace()
+        assert self.name(next(it)[0]) == "X0"
+        it.close()
+
+    def test_deep(self):
+        modules = [Module("cell0", nets=[Net("A")], terminals=[Terminal("A")])]
+        for i in range(1, 2000):
+            modules.append(
+                Module(
+                    f"cell{i}",
+                    terminals=[Terminal("A")],
+                    nets=[Net("A")],
+                    instances=[Instance(f"cell{i - 1}", "X", ["A"])],
+                )
+            )
+        loop = Module("loop", nets=[Net("A")], instances=[Instance("loop", "X", ["A"])])
+        Design("deep", modules=[*modules, loop])
+        hits = list(modules[-1].nets["A"].iterTrace())
+        assert len(hits) == 1999
+        assert len(hits[-1][0]) == 1999
+        assert [self.name(p) for p, _, _ in loop.nets["A"].iterTrace()] == ["X"]
+
+
+class TestFlatNets:
+    def test_flatten(self):
+        inv = Module(
+            "inv",
+            terminals=[Terminal("A"), Terminal("Z")],
+            nets=[Net("A"), Net("Z"), Net("mid")],
+            instances=[Instance("nch", "M0", {"G": "A", "D": "Z"})],
+        )
+        buf = Module(
+            "buf",
+            terminals=[Terminal("A"), Terminal("Z")],
+            nets=[Net("A"), Net("Z"), Net("mid")],
+            instances=[
+                Instance("inv", "X0", {"A": "A", "Z": "mid"}),
+                Instance("inv", "X1", ["mid", "Z"]),
+            ],
+        )
+        top = Module(
+            "top",
+            nets=[Net("a"), Net("b")],
+            instances=[Instance("buf", "X0", ["a", "b"]), Instance("buf", "X1", ["b"])],
+        )
+        d = Design("design", modules=[inv, buf, top])
+        flat = d.flattenNets()
+        assert flat.top is top
+        assert len(flat.names) == 2 + 2 * (3 + 2 * 3)
+        b = flat.getNode("b")
+        assert flat.getMembers(b) == (
+            "b",
+            "X0/Z",
+            "X0/X1/Z",
+            "X1/A",
+            "X1/X0/A",
+        )
+        assert flat.getNode("X0/X0/Z") == flat.getNode("X0/mid")
+        assert flat.getName(flat.getNode("X0/X1/A")) == "X0/mid"
+        assert flat.getMembers(flat.getNode("X1/Z")) == ("X1/Z", "X1/X1/Z")
+        assert len(flat) == 9
+        with pytest.raises(KeyError):
+            flat.getNode("X2/A")
+        assert d.flattenNets("buf").getMembers(0) == ("A", "X0/A")
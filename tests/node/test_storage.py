@@ -0,0 +1,122 @@
+import pickle
+
+import pytest
+
+from ichier.node import (
+    Design,
+    DesignateReference,
+    Instance,
+    Module,
+    Net,
+    Terminal,
+)
+from ichier.utils.escape import EscapeString
+
+
+class TestStorage:
+    def make(self) -> Design:
+        inv = Module(
+            name="inv",
+            terminals=[Terminal("A", "input"), Terminal("Z", "output")],
+            nets=[Net("A"), Net("Z"), Net(EscapeString("\\n+1"))],
+            instances=[
+                Instance(
+                    "pch", "MP", ["Z", "A", "VDD", "VDD"], {"w": "1u"}, prefix="M"
+                ),
+                Instance("nch", "MN", ["Z", "A", "VSS", "VSS"], orderparams=["0.5u"]),
+            ],
+            parameters={"l": 0.1, "n": 2, "flag": True},
+            specparams={"tpd": "1.5"},
+            prefix="X",
+        )
+        inv.lineno = 3
+        top = Module(
+            name="top",
+            terminals=[Terminal("in"), Terminal("out")],
+            nets=[Net("in"), Net("out")],
+            instances=[
+                Instance("inv", "X0", {"A": "in", "Z": "mid"}, prefix=None),
+                Instance("inv", "X1", {"A": "mid", "Z": "out"}),
+                Instance(DesignateReference("ext"), "X2", ["in", "out"]),
+                Instance(None, "X3", raw="X3 in out bad", error=ValueError("bad")),
+            ],
+            prefix="U",
+        )
+        design = Design("chip", [inv, top], {"temp": 25}, priority=(1, 2))
+        design.path = "chip.sp"
+        return design
+
+    def test_round_trip(self, tmp_path):
+        design = self.make()
+        path = tmp_path / "chip.db"
+        design.save(path)
+        loaded = Design.load(path)
+
+        assert loaded.name == "chip"
+        assert loaded.path == design.path
+        assert loaded.priority == (1, 2)
+        assert dict(loaded.parameters) == {"temp": 25}
+        assert list(loaded.modules.keys()) == ["inv", "top"]
+        # 先访问后面的模块，模块按需加载
+        top = loaded.modules["top"]
+        x0, x1, x2, x3 = top.instances
+        assert x0.prefix == "X" and x0.reference.getMaster() is loaded.modules["inv"]
+        assert dict(x1.connection) == {"A": "mid", "Z": "out"}
+        assert isinstance(x2.reference, DesignateReference)
+        assert x3.reference.type == "Unknown"
+        assert (x3.raw, x3.error) == ("X3 in out bad", "bad")
+        assert top.prefix == "U"
+
+        inv = loaded.modules["inv"]
+        assert inv.lineno == 3
+        assert [(t.name, t.direction) for t in inv.terminals] == [
+            ("A", "input"),
+            ("Z", "output"),
+        ]
+        assert isinstance(inv.nets.figs[2].name, EscapeString)
+        assert dict(inv.parameters) == {"l": 0.1, "n": 2, "flag": True}
+        assert dict(inv.specparams) == {"tpd": "1.5"}
+        assert list(inv.instances["MN"].connection) == ["Z", "A", "VSS", "VSS"]
+        assert list(inv.instances["MN"].orderparams) == ["0.5u"]
+        assert dict(inv.instances["MP"].parameters) == {"w": "1u"}
+        assert loaded.dumpToSpice() == design.dumpToSpice()
+        assert loaded.getFlatCounts() == design.getFlatCounts()
+
+        # 保存重新加载的设计，内容不变
+        loaded.save(tmp_path / "again.db")
+        assert (tmp_path / "again.db").read_bytes() == path.read_bytes()
+
+        # 未重建的连接和悬空端口
+        instances = [
+            Instance("r", "R0", ["a", None]),
+            Instance("inv", "X0", {"A": ("a", "b"), "Z": "c"}),
+        ]
+        Design("d", [Module("m", instances=instances)]).save(path)
+        r0, x0 = Design.load(path).modules["m"].instances
+        assert list(r0.connection) == ["a", None]
+        assert dict(x0.connection) == {"A": ("a", "b"), "Z": "c"}
+
+    def test_lazy_copy(self, tmp_path):
+        design = self.make()
+        design.save(tmp_path / "chip.db")
+        loaded = Design.load(tmp_path / "chip.db")
+        # 序列化时加载所有模块，不依赖原文件
+        copied = pickle.loads(pickle.dumps(loaded))
+        assert copied.dumpToSpice() == design.dumpToSpice()
+        assert loaded.dumpToSpice() == design.dumpToSpice()
+
+        empty = Design("empty")
+        empty.save(tmp_path / "empty.db")
+        assert len(Design.load(tmp_path / "empty.db").modules) == 0
+
+    def test_invalid(self, tmp_path):
+        path = tmp_path / "bad.db"
+        path.write_bytes(b"not a design file at all")
+        with pytest.raises(ValueError):
+            Design.load(path)
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            Design.load(path)
+        design = Design("d", [Module("m", parameters={"x": object()})])
+        with pytest.raises(TypeError):
+            design.save(tmp_path / "d.db")
@@ -1,10 +1,29 @@
-from ichier.parser.spice.p_inst import InstLexer, parse
+import pytest
+
+from ichier.parser.spice.p_inst import InstLexer, InstParser, fastParse, parse
 
 
 def expand_token(t):
     return t.type, t.value
 
 
+def expand_inst(inst):
+    if isinstance(inst.connection, dict):
+        connection = list(inst.connection.items())
+    else:
+        connection = list(inst.connection)
+    return (
+        inst.name,
+        inst.reference.type,
+        inst.reference.name,
+        inst.connection.type,
+        connection,
+        list(inst.parameters.items()),
+        list(inst.orderparams),
+        inst.prefix,
+    )
+
+
 class TestSyntax:
     def test_inst_subckt1(self):
         lexer = InstLexer()
@@ -441,3 +460,56 @@ class TestSyntax:
             "length": "1u",
             "width": "2u",
         }
+
+
+class TestFastPath:
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "X0 net1 net2 net3 net4 nch m=1 length=4u width=10u",
+            "X0 net1 net2 net3 net4 nch",
+            "X0 net1 net2 net3 net4 / nch m=1 length=4u width=10u",
+            "X0 net1 net2 net3 net4 / nch",
+            "X0 nch m=1 length=4u width=10u "
+            "$PINS pin1=net1 pin2=net2 pin3=net3 pin4=net4",
+            "X0 nch $PINS pin1=net1 pin2=net2 pin3=net3 pin4=net4",
+            "X0 nch $PINS",
+            "X0 / nch m=1 length=4u width=10u "
+            "$PINS pin1=net1 pin2=net2 pin3=net3 pin4=net4",
+            "X0 / nch $PINS pin1=net1 pin2=net2 pin3=net3 pin4=net4",
+            "X0 / nch $PINS",
+            "X0 / nch",
+            "X0 net1 / nch $T=0 0 0 0 m=1",
+            "R0 net1 net2 pdk_res 1.2K length=10u width=1u",
+            "R0 net1 net2 pdk_res r=1.2K length=10u width=1u",
+            "R0 net1 net2 1.2K $[pdk_res] length=10u width=1u",
+            "R0 net1 net2 r=1.2K $[pdk_res] length=10u width=1u",
+            "Q0 net1 net2 net3 pdk_pnp 25 length=5u width=5u",
+            "Q0 net1 net2 net3 pdk_pnp area=25 length=5u width=5u",
+            "Q0 net1 net2 net3 25 $[pdk_pnp] length=5u width=5u",
+            "Q0 net1 net2 net3 area=25 $[pdk_pnp] length=5u width=5u",
+            "M0 net1 net2 net3 net4 pdk_mos length=1u width=2u",
+            "M0 net1 net2 net3 net4 $[pdk_mos] length=1u width=2u",
+            "m0 d g s b nch w=1u l=1u",
+            "Xi1 A inter inv size=x2",
+        ],
+    )
+    def test_parity(self, text):
+        inst = fastParse(text)
+        assert inst is not None
+        assert expand_inst(inst) == expand_inst(InstParser().parse(text, fast=False))
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "X0 nch m=1",
+            "X0 / nch m=1",
+            "X0 net1 net2 $PINS pin1=net1",
+            "R0 net1 net2 m=1",
+            "R0 net1 net2 a=b=c",
+            "M0 net1 net2 net3 net4 $PINSX",
+            "net1 net2 nch",
+        ],
+    )
+    def test_fallback(self, text):
+        assert fastParse(text) is None
@@ -1,6 +1,7 @@
 from textwrap import dedent
 
-from ichier.parser.spice import fromCode
+from ichier.parser.cache import ParseCache
+from ichier.parser.spice import fromCode, fromFile, parseInclude, splitSubckts
 from ichier import Module
 
 
@@ -37,3 +38,128 @@ class TestSpiceParser:
         design = fromCode(code)
         assert tuple(map(str, design.modules["module"].terminals)) == ("in", "out")
         assert design.modules["module"].parameters == {"a": "1", "b": "2"}
+
+    def test_split_subckt(self):
+        code = """\
+        * header
+        .SUBCKT inv A Z
+        M0 Z A VDD VDD pch
+        M1 Z A VSS VSS nch
+        .ENDS
+
+        .SUBCKT buf A Z
+        X0 A net inv
+        X1 net Z inv
+        .ENDS
+
+        .subckt inv A Z
+        X0 A Z inv2
+        .ends
+        """
+        code = dedent(code)
+        chunks = splitSubckts(code, chunk_size=1)
+        assert [offset for offset, _ in chunks] == [0, 6, 11]
+        assert "".join(chunk for _, chunk in chunks) == code
+
+        design = fromCode(code, chunk_size=1)
+        whole = fromCode(code)
+        assert [m.name for m in design.modules] == [m.name for m in whole.modules]
+        assert [m.lineno for m in design.modules] == [2, 7]
+        assert design.modules["inv"].instances["M0"].reference == "pch"
+
+    def test_parse_cache(self, tmp_path):
+        top = tmp_path / "top.cdl"
+        inc = tmp_path / "inc.cdl"
+        top.write_text(dedent("""\
+            .INCLUDE "{inc}"
+            .SUBCKT buf A Z
+            X0 A net inv
+            X1 net Z inv
+            .ENDS
+            """).format(inc=inc))
+        inc.write_text(".SUBCKT inv A Z\nM0 Z A VSS VSS nch\n.ENDS\n")
+        cache = ParseCache(tmp_path / "cache")
+        items = parseInclude(file=str(top))
+        assert [cache.load(item) for item in items] == [None, None]
+
+        design = fromFile(top, cache_dir=cache.directory)
+        assert len(design.modules["inv"].instances) == 1
+        assert all(cache.load(item) is not None for item in items)
+        design = fromFile(top, cache_dir=cache.directory)
+        assert [m.name for m in design.modules] == ["buf", "inv"]
+        assert design.modules["inv"].path == inc
+
+        inc.write_text(
+            ".SUBCKT inv A Z\nM0 Z A VSS VSS nch\nM1 Z A VDD VDD pch\n.ENDS\n"
+        )
+        assert cache.load(items[0]) is not None
+        assert cache.load(items[1]) is None
+        design = fromFile(top, cache_dir=cache.directory)
+        assert len(design.modules["inv"].instances) == 2
+
+
+class TestSpiceWriter:
+    def make(self):
+        code = """\
+        .SUBCKT inv A Z
+        *.PININFO A:I Z:O
+        M0 Z A VDD VDD pch w=1u l=0.1u
+        M1 Z A VSS VSS nch w=1u l=0.1u
+        .ENDS
+
+        .SUBCKT buf A Z
+        X0 A net1 / inv
+        X1 / inv $PINS A=net1 Z=Z
+        .ENDS
+
+        .SUBCKT empty
+        .ENDS
+        """
+        return fromCode(dedent(code))
+
+    def test_write(self, tmp_path):
+        import gzip
+        import io
+
+        design = self.make()
+        text = design.dumpToSpice(width_limit=20)
+        assert text.endswith(".SUBCKT empty\n.ENDS")
+        f = io.StringIO()
+        design.writeSpice(f, width_limit=20)
+        assert f.getvalue() == text
+        f = io.BytesIO()
+        design.writeSpice(f, width_limit=20)
+        assert not f.closed
+        assert f.getvalue() == text.encode()
+        design.writeSpice(tmp_path / "design.sp.gz", width_limit=20)
+        assert (
+            gzip.decompress((tmp_path / "design.sp.gz").read_bytes()).decode() == text
+        )
+        with gzip.open(tmp_path / "buf.sp.gz", "wb") as g:
+            design.modules["buf"].writeSpice(g)
+        with gzip.open(tmp_path / "buf.sp.gz", "rt") as g:
+            assert g.read() == design.modules["buf"].dumpToSpice()
+        inst = design.modules["buf"].instances["X0"]
+        inst.writeSpice(tmp_path / "x0.sp")
+        assert (tmp_path / "x0.sp").read_text() == inst.dumpToSpice()
+
+    def test_parallel(self):
+        import io
+
+        from ichier import Design, Instance, Module
+
+        design = Design(
+            "design",
+            modules=[
+                Module(
+                    f"cell{i}", instances=[Instance("nch", f"M{j}") for j in range(i)]
+                )
+                for i in range(40)
+            ],
+        )
+        text = design.dumpToSpice()
+        assert design.dumpToSpice(workers=3) == text
+        assert design.dumpToSpice(workers=0) == text
+        f = io.BytesIO()
+        design.writeSpice(f, workers=2)
+        assert f.getvalue() == text.encode()
@@ -1,7 +1,7 @@
 from textwrap import dedent
 import re
 
-from ichier.parser.verilog import fromCode, PreProc
+from ichier.parser.verilog import fromCode, splitModules, PreProc
 
 
 class TestSpiceParser:
@@ -82,3 +82,124 @@ class TestSpiceParser:
 ------------""",
             flags=re.MULTILINE,
         )
+
+    def test_split_modules(self):
+        code = """\
+        `timescale 1ns/1ps
+        module inv (A, Z);  // endmodule module fake
+        input A;
+        output Z;
+        specify
+        specparam note = "multi
+        line";
+        endspecify
+        endmodule
+
+        module buf (A, Z);
+        input A;
+        output Z;
+        wire \\module ;
+        inv i0 (.A(A), .Z(\\module ));
+        inv i1 (.A(\\module ), .Z(Z));
+        endmodule
+
+        module inv (A, Z);
+        input A;
+        output Z;
+        endmodule
+        """
+        code = PreProc.process(dedent(code))
+        chunks = splitModules(code, chunk_size=1)
+        assert len(chunks) == 3
+        assert "".join(chunk for _, chunk in chunks) == code
+        assert [offset for offset, _ in chunks] == [0, 9, 17]
+
+        design = fromCode(code, chunk_size=1)
+        whole = fromCode(code)
+        assert [m.name for m in design.modules] == ["inv", "buf"]
+        assert [m.lineno for m in design.modules] == [m.lineno for m in whole.modules]
+        assert design.modules["inv"].specparams == {"note": "multi\nline"}
+
+
+class TestVerilogWriter:
+    def test_round_trip(self):
+        code = """\
+        module cell(in, sel, out);
+        input [3:0] in;
+        input sel;
+        output out;
+        endmodule
+
+        module top(
+            input [3:0] a,
+            input [0:1] s,
+            output [1:0] y
+        );
+        wire [3:0] mid;
+        wire \\odd-name ;
+        cell c0 (.in(a), .sel(s[0]), .out(y[0]));
+        cell c1 (.in({mid[3], a[2], mid[1:0]}), .sel(\\odd-name ), .out(y[1]));
+        cell c2 (a[3:0], s[1], mid[2]);
+        endmodule
+        """
+        design = fromCode(dedent(code))
+        design.modules.rebuild(mute=True, verilog_style=True)
+        text = design.dumpToVerilog()
+        assert "  input [0:1] s;" in text
+        assert "  wire [3:0] mid;" in text
+        assert (
+            "  cell c2 (.in({a[3], a[2], a[1], a[0]}), .sel(s[1]), .out(mid[2]));"
+            in text
+        )
+        assert "\\odd-name " in text
+        copy = fromCode(text)
+        copy.modules.rebuild(mute=True, verilog_style=True)
+        for module in design.modules:
+            other = copy.modules[module.name]
+            assert [(t.name, t.direction) for t in other.terminals] == [
+                (t.name, t.direction) for t in module.terminals
+            ]
+            for inst in module.instances:
+                assert other.instances[inst.name].connection == inst.connection
+        assert copy.dumpToVerilog() == text
+
+    def test_from_spice(self, tmp_path):
+        import gzip
+
+        from ichier.parser.spice import fromCode as fromSpice
+
+        code = """\
+        .SUBCKT reg D<1> D<0> CK Q<1> Q<0> 1bad
+        *.PININFO D<1>:I D<0>:I CK:I Q<1>:O Q<0>:O
+        X0 D<0> n<0> / inv
+        X1 D<1> n<1> / inv
+        XB / bank $PINS A<1>=n<1> A<0>=n<0> Z=Q<0>
+        M0 Q<1> CK VSS VSS nch w=1u l=0.1u
+        .ENDS
+
+        .SUBCKT top IN<1> IN<0> OUT<1> OUT<0> CK
+        XR IN<1> IN<0> CK OUT<1> OUT<0> x / reg
+        .ENDS
+        """
+        design = fromSpice(dedent(code))
+        text = design.dumpToVerilog()
+        assert text.splitlines()[:9] == [
+            "module \\reg (D, CK, Q, \\1bad );",
+            "  input [1:0] D;",
+            "  input CK;",
+            "  output [1:0] Q;",
+            "  inout \\1bad ;",
+            "  wire [1:0] n;",
+            "  wire VSS;",
+            "  inv X0 (D[0], n[0]);",
+            "  inv X1 (D[1], n[1]);",
+        ]
+        assert "  bank XB (.A({n[1], n[0]}), .Z(Q[0]));" in text
+        assert '  nch #(.w("1u"), .l("0.1u")) M0 (Q[1], CK, VSS, VSS);' in text
+        assert "  \\reg XR ({IN[1], IN[0]}, CK, {OUT[1], OUT[0]}, x);" in text
+        design.writeVerilog(tmp_path / "design.v.gz")
+        assert gzip.decompress((tmp_path / "design.v.gz").read_bytes()).decode() == text
+        assert design.modules["reg"].instances["X0"].dumpToVerilog() == (
+            "  inv X0 (D[0], n[0]);"
+        )
+        assert design.dump("verilog") == text
@@ -1,3 +1,5 @@
+import pickle
+
 from ichier.utils.escape import needEscape, EscapeString, makeSafeString
 
 
@@ -23,3 +25,9 @@ class TestEscapeString:
         id_2 = makeSafeString(id_1)
         assert id_2 == "123"
         assert id_1 is id_2
+
+    def test_pickle(self):
+        id_1 = EscapeString("\\module")
+        id_2 = pickle.loads(pickle.dumps(id_1))
+        assert id_2 == "module"
+        assert isinstance(id_2, EscapeString)
@@ -1,4 +1,8 @@
-from ichier.utils import parseMemName
+from concurrent.futures import ThreadPoolExecutor
+
+from ichier.utils import bitInfoSplit, parseMemName, parseMemNames
+from ichier.utils.name_parse import parse as nameparse
+from ichier.utils.name_parse import getParser
 
 
 class TestFig:
@@ -30,3 +34,35 @@ class TestFig:
             "C",
             "D[2:0]",
         )
+
+    def test_flatten(self):
+        assert parseMemName("A", flatten=True) == "A"
+        assert parseMemName("{A[1:0]}, B", flatten=True) == ("A[1]", "A[0]", "B")
+
+    def test_batch(self):
+        assert parseMemNames(["A<1:0>", "B", "{C[1:0]}, D"]) == [
+            ("A<1>", "A<0>"),
+            "B",
+            (("C[1]", "C[0]"), "D"),
+        ]
+        assert parseMemNames(["{C[1:0]}, D"], flatten=True) == [("C[1]", "C[0]", "D")]
+
+    def test_cache(self):
+        nameparse.cache_clear()
+        assert parseMemName("A[3:0]") is parseMemName("A[3:0]")
+        assert nameparse.cache_info().hits == 1
+
+    def test_threads(self):
+        names = [f"N{i}[{i % 7 + 1}:0]" for i in range(2000)]
+        nameparse.cache_clear()
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(parseMemName, names))
+        nameparse.cache_clear()
+        assert results == [parseMemName(name) for name in names]
+        assert getParser() is getParser()
+
+    def test_bit_info(self):
+        assert bitInfoSplit("data[3]") == ("data", 3)
+        assert bitInfoSplit("D<12>") == ("D", 12)
+        assert bitInfoSplit("a[1][2]") == ("a[1][2]", None)
+        assert bitInfoSplit("net") == ("net", None)
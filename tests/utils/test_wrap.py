@@ -0,0 +1,31 @@
+from textwrap import wrap
+
+from ichier.utils import wrapTokens
+from ichier import Instance
+
+
+class TestWrapTokens:
+    def test_textwrap(self):
+        text = " ".join(f"net{i}" for i in range(50))
+        for width in (12, 20, 88):
+            assert wrapTokens(text, width) == "\n".join(
+                wrap(text, width=width, subsequent_indent="+ ")
+            )
+        assert wrapTokens(text, 30, indent="*.I ", initial="*.I ") == "\n".join(
+            wrap(text, width=30, initial_indent="*.I ", subsequent_indent="*.I ")
+        )
+        assert wrapTokens("", 10) == ""
+
+    def test_long_token(self):
+        assert wrapTokens("X0 a / cell_with_a_long_name", 12) == (
+            "X0 a /\n+ cell_with_a_long_name"
+        )
+        assert wrapTokens("cell_with_a_long_name x", 12) == "cell_with_a_long_name\n+ x"
+
+    def test_no_wrap(self):
+        inst = Instance("ref", "X0", [f"n{i}" for i in range(100)])
+        assert "\n" not in inst.dumpToSpice(width_limit=0)
+        lines = inst.dumpToSpice().split("\n")
+        assert inst.dumpToSpice(width_limit=0) == " ".join(
+            [lines[0], *(line[2:] for line in lines[1:])]
+        )
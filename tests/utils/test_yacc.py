@@ -0,0 +1,26 @@
+from ichier.utils.name_parse.parser import Parser
+
+
+class TestCachedYacc:
+    def test_cache_tables(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ICHIER_CACHE_DIR", str(tmp_path))
+        assert Parser().parse("A[1:0]") == ("A[1]", "A[0]")
+        tables = list((tmp_path / "ply").glob("name_parse-*.pickle"))
+        assert len(tables) == 1
+        assert Parser().parse("A[1:0]") == ("A[1]", "A[0]")
+        assert list((tmp_path / "ply").iterdir()) == tables
+
+    def test_broken_cache(self, tmp_path, monkeypatch, caplog):
+        monkeypatch.setenv("ICHIER_CACHE_DIR", str(tmp_path))
+        Parser()
+        (table,) = (tmp_path / "ply").iterdir()
+        table.write_bytes(b"broken")
+        assert Parser().parse("A<1:0>") == ("A<1>", "A<0>")
+        assert table.read_bytes() != b"broken"
+        assert "Broken parse table cache" in caplog.text
+
+    def test_disable_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ICHIER_CACHE_DIR", "")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert Parser().parse("A") == "A"
+        assert not list(tmp_path.iterdir())